@@ -1,21 +1,22 @@
 # src/RaceSimulator.py
 
 from src.sim.RaceManager import RaceManager
+from src.sim.HeadlessRunner import HeadlessRunner, RaceResult, ENGINE_MODES
+from src.sim.RaceLog import LOG_MODES
+from src.sim.RngStreams import RNG_MODES
+from src.agents.StrategyPlanner import PLANNER_MODES
+from src.sim.ConfigRegistry import CONFIGS
+import argparse
 import json
 
-# ===== FILE PATHS =====
-circuit_filepath = "configs/circuits.json"
-
 # ===== CONFIG LOADERS =====
 def load_simulation_config(sim_filepath):
-    # Load the saved custom simulation config
-    with open(sim_filepath, "r") as config_file:
-        return json.load(config_file)
+    # Load the saved custom simulation config, parsed once per file version
+    return CONFIGS.load_json(sim_filepath)
 
 def load_circuit_database():
-    # Load the default circuit database
-    with open(circuit_filepath, "r") as circuit_file:
-        return json.load(circuit_file)
+    # Load the default circuit database from the process-wide registry
+    return CONFIGS.circuits()
 
 # ===== CIRCUIT SETUP =====
 def build_final_characteristics(config_characteristics, default_characteristics):
@@ -32,7 +33,7 @@ def build_final_characteristics(config_characteristics, default_characteristics)
 
 
 # ===== MAIN ENTRY =====
-def main(sim_filepath):
+def main(sim_filepath, seed=300, log_mode="buffered", lap_store_path=None, rng_mode="shared", planner_mode="heuristic"):
     # Load saved race config
     config_data = load_simulation_config(sim_filepath)
 
@@ -65,8 +66,56 @@ def main(sim_filepath):
         pit_speed = circuit_params["pit_lane"]["pit_speed_limit_mps"],
         starting_grid = starting_grid,
         circuit_characteristics = final_characteristics,
-        seed = 300,
-        config_filepath = sim_filepath
+        seed = seed,
+        config_filepath = sim_filepath,
+        log_mode = log_mode,
+        lap_store_path = lap_store_path,
+        rng_mode = rng_mode,
+        planner_mode = planner_mode
     )
 
-    return rm
\ No newline at end of file
+    return rm
+
+
+# ===== HEADLESS ENTRY =====
+def run_headless(sim_filepath, seed=300, max_ticks=None, engine="fixed", log_mode="buffered", lap_store_path=None, rng_mode="shared", planner_mode="heuristic") -> RaceResult:
+    # Run a saved race config to the flag without the pygame Simulation screen
+    rm = main(sim_filepath, seed=seed, log_mode=log_mode, lap_store_path=lap_store_path, rng_mode=rng_mode, planner_mode=planner_mode)
+    runner = HeadlessRunner(rm, max_ticks=max_ticks, engine=engine)
+    return runner.run()
+
+def print_race_result(result: RaceResult) -> None:
+    print(f"{result.grandprix} ({result.season}) - seed {result.seed} - {result.engine} engine")
+
+    for entry in result.classification:
+        if entry.status != "FINISHED":
+            time_str = "DNF"
+        elif entry.position == 1:
+            time_str = f"{entry.total_time:.3f}s"
+        else:
+            time_str = f"+{entry.gap_to_winner:.3f}s"
+
+        print(f"P{entry.position:02d} | {entry.car_id:<5} | {entry.team_id:<18} | {time_str:>12} | Stops: {entry.pit_stops}")
+
+    print(f"\nTicks: {result.ticks} | Wall time: {result.wall_time_s:.2f}s | {result.ticks_per_second:,.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a saved RaceConfig JSON headlessly.")
+    parser.add_argument("config", help="Path to a saved RaceConfig JSON file")
+    parser.add_argument("--seed", type=int, default=300, help="Random seed for the race")
+    parser.add_argument("--engine", choices=ENGINE_MODES, default="fixed", help="Fixed 1/120 s ticks, adaptive clear-air steps or NumPy vector ticks")
+    parser.add_argument("--log-mode", choices=LOG_MODES, default="buffered", help="Buffered race log, buffered with a background writer thread, or no log")
+    parser.add_argument("--lap-store", default=None, help="Optional path to write per-lap records as a memory-mappable .npy file")
+    parser.add_argument("--rng", choices=RNG_MODES, default="shared", help="One shared generator in call order (replays old seeds) or independent counter-based streams per car")
+    parser.add_argument("--planner", choices=PLANNER_MODES, default="heuristic", help="Team heuristics or rollout-scored pit decisions")
+    parser.add_argument("--max-ticks", type=int, default=None, help="Stop early after this many ticks")
+    parser.add_argument("--output", default=None, help="Optional path to write the race result as JSON")
+    args = parser.parse_args()
+
+    race_result = run_headless(args.config, seed=args.seed, max_ticks=args.max_ticks, engine=args.engine, log_mode=args.log_mode, lap_store_path=args.lap_store, rng_mode=args.rng, planner_mode=args.planner)
+    print_race_result(race_result)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(race_result.to_dict(), output_file, indent=4)
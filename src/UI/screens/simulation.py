@@ -354,7 +354,6 @@ class Simulation:
     # ===== TIMING TOWER =====
     def get_live_classification(self):
         finished_cars = []
-        running_cars = []
         pit_cars = []
         dnf_cars = []
 
@@ -367,15 +366,13 @@ class Simulation:
                 
             elif car.in_pit_lane:
                 pit_cars.append(car)
-                
-            else:
-                running_cars.append(car)
 
         # Finished cars must be ordered by total race time
         finished_cars.sort(key=lambda car: car.total_time)
 
-        # Running and pit cars are still ordered by race progress
-        running_cars.sort(key=lambda car: self.rm.get_progress(car), reverse=True)
+        # Running cars come straight from the race's running order, pit cars are still ordered by race progress
+        running_order = self.rm.running_order
+        running_cars = [car for car in running_order.refresh() if car.lap_count < self.rm.total_laps]
         pit_cars.sort(key=lambda car: self.rm.get_progress(car), reverse=True)
 
         classification = []
@@ -411,8 +408,7 @@ class Simulation:
                 gap_ahead = f"+{max(0.0, (car.total_time + car.current_lap_time) - finished_ahead.total_time):.3f}"
                 
             else:
-                ahead_car = running_cars[index - 1]
-                gap_distance = max(0.0, self.rm.get_progress(ahead_car) - self.rm.get_progress(car))
+                gap_distance = running_order.gap_ahead(car)
                 ref_speed = max(car.last_speed_mps, 1.0)
                 time_gap = gap_distance / ref_speed
                 gap_ahead = f"+{time_gap:.3f}"
@@ -831,20 +827,8 @@ class Simulation:
 
         while self.last_position_history_lap < latest_logged_lap:
             lap_to_store = self.last_position_history_lap + 1
-            lap_rows = []
-
-            for car in self.rm.cars:
-                lap_record = self.rm.get_lap_record(car, lap_to_store)
-                if lap_record is not None:
-                    lap_rows.append({
-                        "car": car,
-                        "total_time": lap_record["total_time"]
-                    })
-
-            lap_rows.sort(key=lambda row: row["total_time"])
 
-            for position, row in enumerate(lap_rows, start=1):
-                car = row["car"]
+            for position, (car, _) in enumerate(self.rm.get_lap_classification(lap_to_store), start=1):
                 self.position_history[car.car_id].append((float(lap_to_store), position))
 
             self.last_position_history_lap = lap_to_store
@@ -1583,10 +1567,16 @@ class Simulation:
             if self.rm.race_finished:
                 self.sim_finished = True
                 self.rm.log_final_classification()
+                self.rm.close_outputs()
                 self.cached_classification = self.get_live_classification()
                 self.update_race_event_messages()
                 self.update_tyre_graph_order()
 
+        # Leaving mid-race (window closed or another screen) still writes out the buffered log
+        # and stops the async writer; closing twice is harmless.
+        if self.s_Mode != "Simulation":
+            self.rm.close_outputs()
+
         self.render()
         pygame.display.flip()
         fpsClock.tick(FPS)
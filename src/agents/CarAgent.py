@@ -1,7 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterator, List, Optional
 from src.models.TyreModel import TyreModel, TyreState
+from src.sim.RngStreams import CarRandomStreams
 
 @dataclass
 class CarCalibration:
@@ -10,8 +11,68 @@ class CarCalibration:
     reliability_prob: float = 0.0
 
 
+# ===== LAP HISTORY =====
+class LapRecord:
+    # One completed lap. Slots keep it a fraction of the size of a dict, and the
+    # mapping methods let older dict-style readers keep using record["lap"].
+    __slots__ = ("lap", "lap_time", "total_time", "compound", "tyre_age", "weekend_role", "stint_id")
+
+    def __init__(self, lap: int, lap_time: float, total_time: float, compound: str, tyre_age: float, weekend_role: str, stint_id: int):
+        self.lap = lap
+        self.lap_time = lap_time
+        self.total_time = total_time
+        self.compound = compound
+        self.tyre_age = tyre_age
+        self.weekend_role = weekend_role
+        self.stint_id = stint_id
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def keys(self) -> tuple[str, ...]:
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class LapHistory:
+    # Completed laps in the order they were run, with an O(1) lookup by lap number.
+    __slots__ = ("records", "index_by_lap")
+
+    def __init__(self):
+        self.records: List[LapRecord] = []
+        self.index_by_lap: dict[int, int] = {}
+
+    def append(self, record: LapRecord) -> None:
+        self.index_by_lap[record.lap] = len(self.records)
+        self.records.append(record)
+
+    def by_lap(self, lap_number: int) -> Optional[LapRecord]:
+        index = self.index_by_lap.get(lap_number)
+        return None if index is None else self.records[index]
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[LapRecord]:
+        return iter(self.records)
+
+    def __bool__(self) -> bool:
+        return bool(self.records)
+
+
 class CarAgent:
-    def __init__(self, car_id: str, team_id: str, calibration: CarCalibration, tyre_state: TyreState, tyre_model: TyreModel, rng):
+    def __init__(self, car_id: str, team_id: str, calibration: CarCalibration, tyre_state: TyreState, tyre_model: TyreModel, rng, streams: CarRandomStreams | None = None):
         # ===== CAR IDENTITY =====
         self.car_id = car_id
         self.team_id = team_id
@@ -22,9 +83,15 @@ class CarAgent:
         self.tyre_model = tyre_model
         # ===== RANDOMNESS / EXECUTION =====
         self.rng = rng
+        # Per-purpose draw sources; by default all of them are the shared race generator.
+        self.streams = streams if streams is not None else CarRandomStreams.shared(rng)
         self.instruction: Optional[str] = None
         self.lap_execution_noise: float = 0.0
         self.last_lap_for_noise: int = -1
+        # ===== LAP PACE CACHE =====
+        # base_speed only moves with the inputs in the key, which change at the line, in the pits or on race events.
+        self.pace_cache_key: tuple | None = None
+        self.pace_cache_base_speed: float = 0.0
         # ===== TIMING STATE =====
         self.total_time: float = 0.0
         self.current_lap_time: float = 0.0
@@ -85,7 +152,11 @@ class CarAgent:
         self.track_position: float = 0.0
         self.prev_track_position: float = 0.0
         self.lap_count: int = 0
-        self.completed_laps: list[dict] = []
+        self.segment_cursor: int = 0
+        # Next DRS detection / pit entry marker, valid while prev_track_position equals the anchor.
+        self.next_marker: float = float("inf")
+        self.marker_anchor: float = float("nan")
+        self.completed_laps = LapHistory()
         self.has_taken_race_start = False
 
     # ===== SPATIAL HELPERS =====
@@ -121,21 +192,10 @@ class CarAgent:
         return crossed_line, crossing_ratio
 
     # ===== SPEED / PACE MODEL =====
-    def compute_speed(self, segment: dict, track_length: float, base_lap_time: float, lap_time_std: float, evolution_level: float, track_deg_multiplier: float, drs_available: bool, total_laps: int, track_state: str = "GREEN") -> float:
-        # Convert the current tyre, fuel, traffic and segment context into a speed.
-        if self.retired:
-            return 0.0
-
-        safe_track_length = max(1e-6, float(track_length))
-        safe_total_laps = max(1, int(total_laps))
-        std_scale = max(float(lap_time_std), 1e-6)
-
-        if self.lap_count != self.last_lap_for_noise:
-            self.lap_execution_noise = self.rng.gauss(0.0, 0.16 * std_scale)
-            self.last_lap_for_noise = self.lap_count
-
+    def compute_base_speed(self, track_length: float, base_lap_time: float, evolution_level: float, track_deg_multiplier: float, total_laps: int, track_state: str) -> float:
+        # Lap-level pace before segment, noise, traffic, DRS and defence effects.
         tyre_delta = self.tyre_model.lap_delta(tyre_state=self.tyre_state, track_deg_multiplier=track_deg_multiplier, team_deg_factor=self.calibration.k_team)
-        race_fraction = min(1.0, max(0.0, self.lap_count / safe_total_laps))
+        race_fraction = min(1.0, max(0.0, self.lap_count / total_laps))
 
         # Fuel load fades away during the race so cars gradually get quicker.
         fuel_penalty = 1.70 * (1.0 - race_fraction)
@@ -149,7 +209,31 @@ class CarAgent:
         elif track_state == "SC":
             effective_lap_time *= 1.55
 
-        base_speed = safe_track_length / max(effective_lap_time, 1e-6)
+        return track_length / max(effective_lap_time, 1e-6)
+
+    def compute_speed(self, segment: dict, track_length: float, base_lap_time: float, lap_time_std: float, evolution_level: float, track_deg_multiplier: float, drs_available: bool, total_laps: int, track_state: str = "GREEN", noise_scale: float = 1.0) -> float:
+        # Convert the current tyre, fuel, traffic and segment context into a speed.
+        # noise_scale shrinks the per-call noise when one call stands in for several ticks.
+        if self.retired:
+            return 0.0
+
+        safe_track_length = max(1e-6, float(track_length))
+        safe_total_laps = max(1, int(total_laps))
+        std_scale = max(float(lap_time_std), 1e-6)
+
+        if self.lap_count != self.last_lap_for_noise:
+            self.lap_execution_noise = self.streams.lap_noise.gauss(0.0, 0.16 * std_scale)
+            self.last_lap_for_noise = self.lap_count
+
+        tyre_state = self.tyre_state
+        pace_key = (self.lap_count, tyre_state.compound, tyre_state.age_laps, tyre_state.weekend_role, evolution_level, track_state, base_lap_time, track_deg_multiplier, safe_track_length, safe_total_laps)
+
+        if pace_key == self.pace_cache_key:
+            base_speed = self.pace_cache_base_speed
+        else:
+            base_speed = self.compute_base_speed(safe_track_length, base_lap_time, evolution_level, track_deg_multiplier, safe_total_laps, track_state)
+            self.pace_cache_key = pace_key
+            self.pace_cache_base_speed = base_speed
 
         seg_len = float(segment.get("length", safe_track_length))
         seg_len = max(seg_len, 1e-6)
@@ -176,7 +260,7 @@ class CarAgent:
             sigma_frac = 0.008
             sigma = seg_time * sigma_frac * std_scale
 
-        seg_time += self.rng.gauss(0.0, sigma)
+        seg_time += self.streams.segment_noise.gauss(0.0, sigma * noise_scale)
 
         if self.instruction == "PUSH":
             seg_time *= 0.997
@@ -187,7 +271,7 @@ class CarAgent:
         if drs_available and seg_type == "straight" and track_state == "GREEN":
             seg_time *= 0.9815
 
-        seg_time += self.rng.gauss(0.0, 0.0012)
+        seg_time += self.streams.segment_noise.gauss(0.0, 0.0012 * noise_scale)
 
         speed = seg_len / max(seg_time, 1e-6)
         speed += self.defend_position()
@@ -292,7 +376,7 @@ class CarAgent:
         base_probability /= max(0.75, min(float(overtake_difficulty), 1.5))
         base_probability = min(max(base_probability, 0.015), 0.35)
 
-        success = self.rng.random() < base_probability
+        success = self.streams.overtake.random() < base_probability
         if success:
             self.overtake_cooldown = 2.0
 
@@ -407,37 +491,31 @@ class CarAgent:
         return True
 
     # ===== DRS =====
-    def update_drs_active(self, drs_enabled: bool, segment_type: str, track_position: float, drs_zones: list[dict], in_window_fn) -> None:
+    def update_drs_active(self, drs_enabled: bool, segment_type: str, track_position: float, drs_windows: list[tuple[int, float, float]], in_window_fn) -> None:
         # Turn DRS on only when the car is in a valid activation zone.
+        # drs_windows are the (zone number, start, end) activation windows that touch the car's segment.
         self.drs_active = False
         if not drs_enabled or segment_type != "straight":
             return
 
-        for zone in drs_zones:
-            znum = int(zone["zone_number"])
+        for znum, a0, a1 in drs_windows:
             stamp = self.drs_eligible_lap.get(znum)
 
             if stamp is None or stamp not in (self.lap_count, self.lap_count - 1):
                 continue
 
-            a0 = float(zone["activation_start"])
-            a1 = float(zone["activation_end"])
-
             if in_window_fn(track_position, a0, a1):
                 self.drs_active = True
                 return
 
-    def update_drs_eligibility(self, drs_enabled: bool, has_car_ahead: bool, gap_ahead_m: float, last_speed_mps: float, drs_zones: list[dict], did_cross_marker_fn, prev_pos: float, curr_pos: float) -> None:
-        # Update whether the car has earned DRS at each detection point.
+    def update_drs_eligibility(self, drs_enabled: bool, has_car_ahead: bool, gap_ahead_m: float, last_speed_mps: float, drs_detections: list[tuple[int, float]], did_cross_marker_fn, prev_pos: float, curr_pos: float) -> None:
+        # Update whether the car has earned DRS at each (zone number, detection point).
         if not drs_enabled or not has_car_ahead:
             return
 
         speed = max(last_speed_mps, 1e-6)
 
-        for zone in drs_zones:
-            znum = int(zone["zone_number"])
-            detect = float(zone["detection_point"])
-
+        for znum, detect in drs_detections:
             if did_cross_marker_fn(prev_pos, curr_pos, detect):
                 gap_s = gap_ahead_m / speed
                 if gap_s <= 1.0:
@@ -451,4 +529,4 @@ class CarAgent:
         if self.calibration.reliability_prob <= 0.0:
             return False
 
-        return self.rng.random() < self.calibration.reliability_prob
\ No newline at end of file
+        return self.streams.reliability.random() < self.calibration.reliability_prob
\ No newline at end of file
@@ -0,0 +1,295 @@
+from __future__ import annotations
+import math
+import random
+import time
+from typing import List, Optional
+
+from src.agents.CarAgent import CarAgent
+from src.sim.RngStreams import stream_key
+
+# ===== PLANNER MODES =====
+# heuristic: TeamAgent's own scoring constants and deterministic projections
+# rollout: candidates scored by stochastic lap-level rollouts of the field around the car
+PLANNER_MODES = ("heuristic", "rollout")
+
+# ===== ROLLOUT SETTINGS =====
+DEFAULT_ROLLOUTS = 24
+MIN_ROLLOUTS = 4
+DEFAULT_HORIZON_LAPS = 20
+MAX_PLANNED_STOPS = 3
+# Cars further than this (plus one pit loss) from the car on the road cannot interact with it.
+FIELD_WINDOW_S = 12.0
+# Closest a following car can cross the line behind the car ahead without passing.
+FOLLOW_GAP_S = 0.35
+PASS_PROBABILITY = 0.45
+# Lap-level noise as a share of the race's lap_time_std.
+LAP_NOISE_SCALE = 0.25
+# Expected gain a stop must show over staying out before it is called.
+PIT_DECISION_MARGIN_S = 0.4
+# Mirrors CarAgent.compute_base_speed.
+FUEL_EFFECT_S = 1.70
+EVOLUTION_EFFECT = 0.0055
+
+class RolloutCar:
+    # One car's starting point and stop plan inside a rollout.
+    __slots__ = ("car_id", "lap_count", "first_fraction", "laps_left", "base_lap", "deltas", "stops", "pit_cost")
+
+    def __init__(self, car_id: str, lap_count: int, first_fraction: float, laps_left: int, base_lap: float, deltas: List[float], stops: tuple[int, ...], pit_cost: float):
+        self.car_id = car_id
+        self.lap_count = lap_count
+        self.first_fraction = first_fraction
+        self.laps_left = laps_left
+        self.base_lap = base_lap
+        # Tyre lap delta for every lap still to run, switching sets after each stop lap.
+        self.deltas = deltas
+        self.stops = stops
+        self.pit_cost = pit_cost
+
+
+class RolloutPlanner:
+    def __init__(self, race_manager, rollouts: int = DEFAULT_ROLLOUTS, time_budget_s: float | None = None, horizon_laps: int = DEFAULT_HORIZON_LAPS):
+        # ===== PLANNER SETUP =====
+        self.rm = race_manager
+        self.rollouts = max(MIN_ROLLOUTS, int(rollouts))
+        # Optional wall-clock cap per decision (never below MIN_ROLLOUTS). Off by default: with a cap the
+        # rollout count depends on machine load, so a seeded race no longer replays exactly.
+        self.time_budget_s = None if time_budget_s is None else max(0.0, float(time_budget_s))
+        self.horizon_laps = max(1, int(horizon_laps))
+        # ===== DECISION STATS =====
+        self.decisions = 0
+        self.rollouts_run = 0
+        self.time_spent_s = 0.0
+
+    # ===== PIT COST =====
+    def net_pit_loss(self) -> float:
+        # Time in the lane minus the time the same stretch of track takes at race pace.
+        rm = self.rm
+        if not rm.pit_enabled or rm.pit_speed <= 0.0:
+            return rm.pit_loss
+
+        if rm.pit_exit_point >= rm.pit_entry_point:
+            bypassed_m = rm.pit_exit_point - rm.pit_entry_point
+        else:
+            bypassed_m = (rm.track_length - rm.pit_entry_point) + rm.pit_exit_point
+
+        lane_time = (rm.pit_lane_distance / rm.pit_speed) + rm.pit_service_time_mean
+        track_time = bypassed_m * rm.base_lap_time / max(rm.track_length, 1e-6)
+        return max(0.0, lane_time - track_time)
+
+    # ===== TYRE DELTAS =====
+    def tyre_deltas(self, car: CarAgent, compound: str, role: Optional[str], start_age: float, n_laps: int) -> List[float]:
+        # Per-lap tyre delta read from the same stint prefix tables the team heuristics use.
+        rm = self.rm
+        table = rm.tyre_model.get_stint_cost_table(compound, role, rm.track_deg_multiplier, car.calibration.k_team)
+        start = max(0, int(round(start_age)))
+        table.extend_to(start + n_laps)
+        prefix = table.prefix
+        return [prefix[start + k + 1] - prefix[start + k] for k in range(n_laps)]
+
+    # ===== STINT PLANS =====
+    def pick_next_role(self, team, sets: dict[str, int], laps_left: int, roles: Optional[List[str]] = None) -> str:
+        # Cheapest set that reaches the flag, otherwise the longest-lived set still in the inventory.
+        candidates = roles or [role for role in ("SOFT", "MEDIUM", "HARD") if sets.get(role, 0) > 0] or ["HARD"]
+        finishing = [role for role in candidates if team.role_max_stint_age(role) >= laps_left]
+
+        if finishing:
+            return min(finishing, key=lambda role: self.rm.tyre_model.get_stint_cost_table(self.rm.compound_map[role], role, self.rm.track_deg_multiplier, 1.0).stint_cost(0.0, laps_left))
+        return max(candidates, key=team.role_target_stint)
+
+    def plan_stints(self, team, car: CarAgent, laps_left: int, first_stop: Optional[int], first_role: Optional[str]) -> tuple[List[float], tuple[int, ...]]:
+        # Tyre delta for every lap still to run, and the laps that end in a stop. After the first stop
+        # each new set runs to its target stint length and stops again while the flag is out of reach,
+        # so no option is judged on a set driven far past its cliff. Stop laps run on the old set.
+        # The role helpers only depend on the track, so the deciding team's helpers serve for rivals too.
+        sets = dict(car.tyre_set_inventory)
+        compound, role, age = car.tyre_state.compound, car.tyre_state.weekend_role, car.tyre_state.age_laps
+        stop_at, next_role = first_stop, first_role
+        deltas: List[float] = []
+        stops: List[int] = []
+        lap = 0
+
+        while lap < laps_left:
+            if stop_at is None or next_role is None or stop_at >= laps_left - 1 or len(stops) >= MAX_PLANNED_STOPS:
+                deltas += self.tyre_deltas(car, compound, role, age, laps_left - lap)
+                break
+
+            deltas += self.tyre_deltas(car, compound, role, age, stop_at - lap + 1)
+            stops.append(stop_at)
+            lap = stop_at + 1
+            sets[next_role] = sets.get(next_role, 0) - 1
+            compound, role, age = self.rm.compound_map[next_role], next_role, 0.0
+
+            stop_at, next_role = None, None
+            if laps_left - lap > team.role_max_stint_age(role):
+                stop_at = lap + max(1, int(round(team.role_target_stint(role)))) - 1
+                next_role = self.pick_next_role(team, sets, laps_left - stop_at - 1)
+
+        return deltas, tuple(stops)
+
+    # ===== FIELD =====
+    def rival_first_stop(self, team, car: CarAgent, laps_left: int) -> tuple[Optional[int], Optional[str]]:
+        # Rivals keep a simple policy: a called stop happens now, otherwise they stop at their
+        # stint target if their tyre cannot reach the flag.
+        if car.pending_pit:
+            return 0, car.next_role or team.get_role_from_code(car.pit_compound)
+
+        if car.in_pit_lane or car.tyre_state.age_laps + laps_left <= car.stint_max_age + 0.75:
+            return None, None
+
+        stop_at = max(0, int(math.ceil(car.stint_target_age - car.tyre_state.age_laps)))
+        return stop_at, self.pick_next_role(team, car.tyre_set_inventory, laps_left - stop_at - 1)
+
+    def build_field(self, focal: CarAgent) -> List[CarAgent]:
+        # Running cars close enough on the road to interact with the focal car.
+        rm = self.rm
+        pace = rm.track_length / max(rm.base_lap_time, 1e-6)
+        window_m = (FIELD_WINDOW_S + self.net_pit_loss()) * pace
+        focal_progress = rm.get_progress(focal)
+
+        return [car for car in rm.cars if car is focal or (not car.retired and abs(rm.get_progress(car) - focal_progress) <= window_m)]
+
+    def laps_to_go(self, car: CarAgent) -> tuple[int, float]:
+        # Line crossings still to make, and how much of the current lap is left to run.
+        rm = self.rm
+        remaining_laps = max(0.0, (rm.total_laps * rm.track_length - rm.get_progress(car)) / rm.track_length)
+        laps_left = max(1, int(math.ceil(remaining_laps - 1e-9)))
+        return laps_left, min(1.0, max(0.0, remaining_laps - (laps_left - 1)))
+
+    def build_rollout_car(self, team, car: CarAgent, first_stop: Optional[int], first_role: Optional[str], pit_cost: float) -> RolloutCar:
+        rm = self.rm
+        laps_left, first_fraction = self.laps_to_go(car)
+
+        if first_role is not None and first_role not in rm.compound_map:
+            first_stop, first_role = None, None
+
+        deltas, stops = self.plan_stints(team, car, laps_left, first_stop, first_role)
+        return RolloutCar(
+            car_id=car.car_id,
+            lap_count=car.lap_count,
+            first_fraction=first_fraction,
+            laps_left=laps_left,
+            base_lap=rm.base_lap_time + car.calibration.mu_team,
+            deltas=deltas,
+            stops=stops,
+            pit_cost=pit_cost,
+        )
+
+    # ===== ROLLOUT =====
+    def lap_time(self, rollout_car: RolloutCar, k: int) -> float:
+        # Noise-free lap time for lap k of the rollout: the compute_base_speed terms at lap level.
+        rm = self.rm
+        race_fraction = min(1.0, max(0.0, (rollout_car.lap_count + k) / max(1, rm.total_laps)))
+        lap_time = rollout_car.base_lap + rollout_car.deltas[k] + FUEL_EFFECT_S * (1.0 - race_fraction)
+        lap_time *= 1.0 - (EVOLUTION_EFFECT * rm.evolution_level)
+
+        if k == 0:
+            lap_time *= rollout_car.first_fraction
+        if k in rollout_car.stops:
+            lap_time += rollout_car.pit_cost
+        return lap_time
+
+    def simulate(self, rollout_cars: List[RolloutCar], base_times: List[List[float]], noise: List[List[float]], passes: List[List[float]], horizon: int) -> List[float]:
+        # Lap-by-lap line crossings with a follow-gap traffic rule, then the noise-free tail.
+        n = len(rollout_cars)
+        clocks = [0.0] * n
+        # Road order: fewer laps to go, then closer to the line, is further up the road.
+        order = sorted(range(n), key=lambda i: (rollout_cars[i].laps_left, rollout_cars[i].first_fraction))
+
+        for k in range(horizon):
+            previous_clock = None
+            previous_lap = None
+            crossing = []
+
+            for i in order:
+                rollout_car = rollout_cars[i]
+                if k >= rollout_car.laps_left:
+                    continue
+
+                clock = clocks[i] + base_times[i][k] + noise[k][i]
+                lap = rollout_car.laps_left - k
+
+                if previous_lap == lap and clock < previous_clock + FOLLOW_GAP_S:
+                    # Caught the car ahead: either clear it this lap or cross the line in its dirty air.
+                    if not (clock < previous_clock and passes[k][i] < PASS_PROBABILITY):
+                        clock = previous_clock + FOLLOW_GAP_S
+
+                clocks[i] = clock
+                crossing.append((lap, clock, i))
+                previous_clock, previous_lap = clock, lap
+
+            crossing.sort()
+            order = [i for _, _, i in crossing] + [i for i in order if k >= rollout_cars[i].laps_left]
+
+        for i, rollout_car in enumerate(rollout_cars):
+            clocks[i] += sum(base_times[i][horizon:])
+
+        return clocks
+
+    # ===== DECISION =====
+    def choose(self, team, car: CarAgent, roles: List[str]) -> tuple[Optional[str], float]:
+        # Best role to pit on now, or None to stay out, with the expected gain in seconds over staying out.
+        start = time.perf_counter()
+        rm = self.rm
+
+        field = self.build_field(car)
+        focal_index = field.index(car)
+        n = len(field)
+        pit_cost = self.net_pit_loss()
+        focal_pit_cost = pit_cost + team.estimate_teammate_stack_delay(car)
+        focal_laps_left, _ = self.laps_to_go(car)
+
+        # Staying out still means stopping at the stint target unless the tyre reaches the flag legally.
+        used_dry = set(car.used_dry_compounds)
+        used_dry.add(car.tyre_state.compound)
+        legal_now = len(used_dry) >= 2 or not team.is_dry_compound(car.tyre_state.compound)
+        stay_stop, stay_role = None, None
+        if not (legal_now and team.can_current_tyre_reach_finish(car)):
+            stay_stop = min(focal_laps_left - 1, max(1, int(math.ceil(car.stint_target_age - car.tyre_state.age_laps))))
+            stay_role = self.pick_next_role(team, car.tyre_set_inventory, focal_laps_left - stay_stop - 1, roles)
+
+        # Rival plans do not depend on the option, so they are built and timed once.
+        rivals = {}
+        for index, other in enumerate(field):
+            if other is not car:
+                rival = self.build_rollout_car(team, other, *self.rival_first_stop(team, other, self.laps_to_go(other)[0]), pit_cost)
+                rivals[index] = (rival, [self.lap_time(rival, k) for k in range(rival.laps_left)])
+
+        options: List[Optional[str]] = [None] + list(roles)
+        plans = []
+        base_times = []
+        for role in options:
+            focal = self.build_rollout_car(team, car, stay_stop if role is None else 0, stay_role if role is None else role, focal_pit_cost)
+            focal_times = [self.lap_time(focal, k) for k in range(focal.laps_left)]
+            plans.append([focal if index == focal_index else rivals[index][0] for index in range(n)])
+            base_times.append([focal_times if index == focal_index else rivals[index][1] for index in range(n)])
+
+        horizon = min(self.horizon_laps, max(rollout_car.laps_left for rollout_car in plans[0]))
+
+        # Common random numbers: every option sees the same noise, so the comparison is not swamped by it.
+        rng = random.Random(stream_key(rm.seed, car.car_id, f"planner:{rm.lap_number}"))
+        sigma = LAP_NOISE_SCALE * rm.lap_time_std
+        finish_sums = [0.0] * len(options)
+        rounds = 0
+
+        while rounds < self.rollouts:
+            if self.time_budget_s is not None and rounds >= MIN_ROLLOUTS and time.perf_counter() - start > self.time_budget_s:
+                break
+
+            noise = [[rng.gauss(0.0, sigma) for _ in range(n)] for _ in range(horizon)]
+            passes = [[rng.random() for _ in range(n)] for _ in range(horizon)]
+
+            for index, plan in enumerate(plans):
+                finish_sums[index] += self.simulate(plan, base_times[index], noise, passes, horizon)[focal_index]
+
+            rounds += 1
+
+        expected = [total / rounds for total in finish_sums]
+        self.decisions += 1
+        self.rollouts_run += rounds
+        self.time_spent_s += time.perf_counter() - start
+
+        best = min(range(1, len(options)), key=lambda index: expected[index])
+        gain = expected[0] - expected[best]
+        if gain > PIT_DECISION_MARGIN_S:
+            return options[best], gain
+        return None, gain
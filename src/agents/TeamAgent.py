@@ -38,6 +38,8 @@ class TeamAgent:
         self.pit_candidates: List[tuple[CarAgent, str]] = []
         self.candidate_scores: dict[str, float] = {}
         self.team_cars: list[CarAgent] = [self.car_a, self.car_b]
+        # Optional RolloutPlanner; None keeps the heuristic scoring below.
+        self.planner = None
         # ===== SMALL TEAM / DRIVER VARIATION =====
         # This keeps strategy behaviour from being exactly identical for every team and driver.
         self.team_strategy_offset = ((sum(ord(c) for c in self.team_id) % 7) - 3) * 0.04
@@ -208,43 +210,28 @@ class TeamAgent:
         live_now = self.get_snapshot(car)
         current_total = live_now.total_time if live_now is not None else car.total_time
 
-        total = current_total
-        age = car.tyre_state.age_laps
-        compound = car.tyre_state.compound
-        role = car.tyre_state.weekend_role
-
+        lap_base = self.base_lap_time + car.calibration.mu_team
         laps_before_stop = min(delay_laps, remaining)
 
-        for lap_idx in range(laps_before_stop):
-            temp_state = TyreState(compound=compound, age_laps=age, weekend_role=role)
-            tyre_delta = self.tyre_model.lap_delta(tyre_state=temp_state, track_deg_multiplier=self.track_deg_multiplier, team_deg_factor=car.calibration.k_team)
-
-            lap_time = self.base_lap_time + car.calibration.mu_team + tyre_delta
-            if lap_idx < 2:
-                lap_time += car.traffic_penalty * 0.35
-
-            total += lap_time
-            age += 1.0
+        total = current_total
+        total += laps_before_stop * lap_base
+        total += self.estimate_stint_tyre_cost(car, car.tyre_state.compound, car.tyre_state.weekend_role, car.tyre_state.age_laps, laps_before_stop)
+        total += min(2, laps_before_stop) * (car.traffic_penalty * 0.35)
 
         total += pit_cost
 
-        new_role = self.get_role_from_code(next_compound_code)
-        compound = next_compound_code
-        role = new_role
-        age = 0.0
-
         laps_after_stop = max(0, remaining - laps_before_stop)
 
-        for _ in range(laps_after_stop):
-            temp_state = TyreState(compound=compound, age_laps=age, weekend_role=role)
-            tyre_delta = self.tyre_model.lap_delta(tyre_state=temp_state, track_deg_multiplier=self.track_deg_multiplier, team_deg_factor=car.calibration.k_team)
-
-            lap_time = self.base_lap_time + car.calibration.mu_team + tyre_delta
-            total += lap_time
-            age += 1.0
+        total += laps_after_stop * lap_base
+        total += self.estimate_stint_tyre_cost(car, next_compound_code, self.get_role_from_code(next_compound_code), 0.0, laps_after_stop)
 
         return total
 
+    def estimate_stint_tyre_cost(self, car: CarAgent, compound: str, role: Optional[str], start_age: float, n_laps: int) -> float:
+        # Summed tyre lap delta for a stint, read from the tyre model's prefix tables.
+        table = self.tyre_model.get_stint_cost_table(compound, role, self.track_deg_multiplier, car.calibration.k_team)
+        return table.stint_cost(start_age, n_laps)
+
     def estimate_physical_pit_time(self) -> float:
         # Base pit time from the real pit lane model.
         if self.pit_speed <= 0.0:
@@ -505,28 +492,17 @@ class TeamAgent:
         current_total = live_now.total_time if live_now is not None else car.total_time
 
         total = current_total
-        age = car.tyre_state.age_laps
-        compound = car.tyre_state.compound
-        role = car.tyre_state.weekend_role
-        stop_applied = False
-
-        for lap_idx in range(remaining):
-            if (next_compound_code is not None) and (not stop_applied):
-                compound = next_compound_code
-                role = self.get_role_from_code(next_compound_code)
-                age = 0.0
-                total += pit_cost
-                stop_applied = True
 
-            temp_state = TyreState(compound=compound, age_laps=age, weekend_role=role)
-            tyre_delta = self.tyre_model.lap_delta(tyre_state=temp_state, track_deg_multiplier=self.track_deg_multiplier, team_deg_factor=car.calibration.k_team)
+        if next_compound_code is not None:
+            total += pit_cost
+            tyre_cost = self.estimate_stint_tyre_cost(car, next_compound_code, self.get_role_from_code(next_compound_code), 0.0, remaining)
 
-            lap_time = self.base_lap_time + car.calibration.mu_team + tyre_delta
-            if lap_idx < 2:
-                lap_time += car.traffic_penalty * 0.35
+        else:
+            tyre_cost = self.estimate_stint_tyre_cost(car, car.tyre_state.compound, car.tyre_state.weekend_role, car.tyre_state.age_laps, remaining)
 
-            total += lap_time
-            age += 1.0
+        total += remaining * (self.base_lap_time + car.calibration.mu_team)
+        total += tyre_cost
+        total += min(2, remaining) * (car.traffic_penalty * 0.35)
 
         return total
 
@@ -778,9 +754,14 @@ class TeamAgent:
     # ===== DESCION PIEPLINE =====
     def decide(self) -> None:
         self.update_race_context()
-        self.evaluate_stint_outcomes()
-        self.assess_undercut_overcut()
-        self.resolve_team_conflicts()
+
+        if self.planner is not None:
+            self.plan_stint_outcomes()
+        else:
+            self.evaluate_stint_outcomes()
+            self.assess_undercut_overcut()
+            self.resolve_team_conflicts()
+
         self.issue_commands()
 
     # ===== STRATEGY LOGIC =====
@@ -879,6 +860,38 @@ class TeamAgent:
                 self.candidate_scores[car.car_id] = best_score
                 car.last_strategy_call_lap = self.current_lap
 
+    def plan_stint_outcomes(self) -> None:
+        # Rollout alternative to the scoring pass: the planner compares pitting now on each legal
+        # role with staying out, for cars inside their review window.
+        if self.remaining_laps <= 1 or self.track_state not in {"GREEN", "SC", "VSC"}:
+            return
+
+        for car in self.team_cars:
+            if car.retired or car.pending_pit or car.in_pit_lane:
+                continue
+
+            if not self.should_start_live_pit_review(car):
+                continue
+
+            if car.last_strategy_call_lap == self.current_lap:
+                continue
+
+            available_roles = [role for role in self.get_available_pit_roles(car) if self.allow_late_stop(car, role)]
+            if not available_roles:
+                continue
+
+            best_role, gain = self.planner.choose(self, car, available_roles)
+            if best_role is not None:
+                self.pit_candidates.append((car, best_role))
+                self.candidate_scores[car.car_id] = gain
+
+        # Stacking both cars costs the second one its queue time, so only the bigger gain stops this lap.
+        self.pit_candidates.sort(key=lambda item: self.candidate_scores.get(item[0].car_id, 0.0), reverse=True)
+        self.pit_candidates = self.pit_candidates[:1]
+
+        for car, _ in self.pit_candidates:
+            car.last_strategy_call_lap = self.current_lap
+
     def resolve_team_conflicts(self) -> None:
         # If both cars want to stop, decide whether the team should allow a stack.
         if len(self.pit_candidates) <= 1:
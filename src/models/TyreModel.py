@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass, replace
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 # ===== TYRE DATA CLASSES =====
 @dataclass
@@ -24,11 +24,47 @@ class TyreState:
     age_laps: float = 0.0
     weekend_role: Optional[str] = None   # SOFT / MEDIUM / HARD / None
 
+class StintCostTable:
+    def __init__(self, tyre_model: TyreModel, compound: str, weekend_role: Optional[str], track_deg_multiplier: float, team_deg_factor: float):
+        # ===== TABLE SETUP =====
+        self.tyre_model = tyre_model
+        self.track_deg_multiplier = float(track_deg_multiplier)
+        self.team_deg_factor = float(team_deg_factor)
+        self.state = TyreState(compound=compound, age_laps=0.0, weekend_role=weekend_role)
+        # prefix[n] is the summed lap delta of the first n laps on a new set.
+        self.prefix: List[float] = [0.0]
+
+    def extend_to(self, laps: int) -> None:
+        # Grow the prefix sums lazily, one exact lap_delta per new whole-lap age.
+        while len(self.prefix) <= laps:
+            self.state.age_laps = float(len(self.prefix) - 1)
+            self.prefix.append(self.prefix[-1] + self.tyre_model.lap_delta(self.state, self.track_deg_multiplier, self.team_deg_factor))
+
+    def stint_cost(self, start_age: float, n_laps: int) -> float:
+        # Summed lap delta of n_laps starting at start_age, one lap of age per lap.
+        n_laps = max(0, int(n_laps))
+
+        if float(start_age).is_integer() and start_age >= 0:
+            start = int(start_age)
+            self.extend_to(start + n_laps)
+            return self.prefix[start + n_laps] - self.prefix[start]
+
+        # Part-worn tyres sit between table ages, so they are summed directly.
+        total = 0.0
+        for lap_idx in range(n_laps):
+            self.state.age_laps = float(start_age) + lap_idx
+            total += self.tyre_model.lap_delta(self.state, self.track_deg_multiplier, self.team_deg_factor)
+
+        return total
+
 class TyreModel:
     def __init__(self, tyres_json: Dict):
         # ===== CORE TYRE DATA =====
         self._tyres: Dict[str, TyreSpec] = {}
         self._role_modifiers: Dict[str, Dict] = tyres_json.get("role_modifiers", {})
+        # ===== RESOLVED CACHES =====
+        self._spec_cache: Dict[Tuple[str, Optional[str]], TyreSpec] = {}
+        self._stint_tables: Dict[Tuple[str, Optional[str], float, float], StintCostTable] = {}
         # ===== LOAD BASE TYRE SPECS =====
         for compound, cfg in tyres_json["tyres"].items():
             self._tyres[compound] = TyreSpec(
@@ -53,6 +89,17 @@ class TyreModel:
 
     # ===== TYRE SPEC RESOLUTION =====
     def _resolve_spec(self, tyre_state: TyreState) -> TyreSpec:
+        # Specs never change after loading, so each (compound, role) is resolved once.
+        key = (tyre_state.compound, tyre_state.weekend_role)
+        spec = self._spec_cache.get(key)
+
+        if spec is None:
+            spec = self._build_spec(tyre_state)
+            self._spec_cache[key] = spec
+
+        return spec
+
+    def _build_spec(self, tyre_state: TyreState) -> TyreSpec:
         compound = tyre_state.compound
 
         if compound not in self._tyres:
@@ -147,4 +194,100 @@ class TyreModel:
         delta += wear_delta * wear_scale
 
         # Prevent unrealistically large negative lap deltas from peak grip
-        return max(-0.10, delta)
\ No newline at end of file
+        return max(-0.10, delta)
+
+    # ===== VECTORISED LAP TIME DELTA =====
+    def lap_delta_array(self, ages, compound, weekend_role, track_deg_multiplier, team_deg_factor):
+        # NumPy version of lap_delta for many ages at once. Every other argument can be a
+        # single value or a sequence aligned with ages. Results match lap_delta exactly.
+        import numpy as np
+
+        age = np.asarray(ages, dtype=float)
+        track = np.broadcast_to(np.asarray(track_deg_multiplier, dtype=float), age.shape)
+        team = np.broadcast_to(np.asarray(team_deg_factor, dtype=float), age.shape)
+
+        if isinstance(compound, str) and (weekend_role is None or isinstance(weekend_role, str)):
+            spec = self._resolve_spec(TyreState(compound=compound, weekend_role=weekend_role))
+            return self._spec_delta_array(np, spec, age, track, team)
+
+        compounds = np.broadcast_to(np.asarray(compound, dtype=object), age.shape)
+        roles = np.broadcast_to(np.asarray(weekend_role, dtype=object), age.shape)
+        delta = np.empty(age.shape, dtype=float)
+
+        for pair in set(zip(compounds.ravel().tolist(), roles.ravel().tolist())):
+            mask = (compounds == pair[0]) & (roles == pair[1])
+            spec = self._resolve_spec(TyreState(compound=pair[0], weekend_role=pair[1]))
+            delta[mask] = self._spec_delta_array(np, spec, age[mask], track[mask], team[mask])
+
+        return delta
+
+    @staticmethod
+    def _phase_power(np, mask, coeff: float, base, exponent: float):
+        # coeff * base ** exponent where mask is set and 0.0 elsewhere. np.power can differ
+        # from the C pow behind float ** in the last bit, so the powers go through floats.
+        term = np.zeros(base.shape, dtype=float)
+        active = base[mask]
+        powers = np.fromiter((value ** exponent for value in active.tolist()), dtype=float, count=active.size)
+        term[mask] = coeff * powers
+        return term
+
+    @classmethod
+    def _spec_delta_array(cls, np, spec: TyreSpec, age, track_deg_multiplier, team_deg_factor):
+        # Same five phases as lap_delta. Inactive phases add 0.0, which leaves every sum
+        # bit-identical to the scalar branches.
+        delta = np.zeros(age.shape, dtype=float)
+
+        # ===== PHASE 1: WARM-UP =====
+        warmup = age < spec.warmup_laps
+        warmup_progress = age / max(spec.warmup_laps, 1e-6)
+        cold_factor = 1.0 - np.minimum(1.0, np.maximum(0.0, warmup_progress))
+        delta += cls._phase_power(np, warmup, spec.warmup_start_penalty, cold_factor, 1.22)
+
+        # ===== PHASE 2: PEAK WINDOW =====
+        peak = (spec.warmup_laps <= age) & (age <= spec.peak_life)
+        peak_centre = 0.5 * (spec.warmup_laps + spec.peak_life)
+        peak_half_span = max(0.70, 0.5 * (spec.peak_life - spec.warmup_laps))
+        distance = np.abs(age - peak_centre) / peak_half_span
+        shape = np.maximum(0.0, 1.0 - cls._phase_power(np, peak, 1.0, distance, 1.40))
+        delta -= np.where(peak, spec.peak_bonus * shape, 0.0)
+
+        wear_delta = np.zeros(age.shape, dtype=float)
+
+        # ===== PHASE 3: PRIMARY WEAR =====
+        post_peak = age > spec.peak_life
+        deg_age = age - spec.peak_life
+        wear_delta += np.where(post_peak, spec.deg_linear * deg_age + cls._phase_power(np, post_peak, spec.deg_quadratic, deg_age, 2), 0.0)
+
+        # ===== PHASE 4: CLIFF =====
+        cliff_start = (spec.cliff_start_age if spec.cliff_start_age is not None else (spec.peak_life + 2.5))
+        cliff = age > cliff_start
+        wear_delta += cls._phase_power(np, cliff, spec.cliff_linear, age - cliff_start, spec.cliff_power)
+
+        # ===== PHASE 5: COLLAPSE =====
+        collapse_start = (spec.collapse_start_age if spec.collapse_start_age is not None else (cliff_start + 4.0))
+        collapse = age > collapse_start
+        wear_delta += cls._phase_power(np, collapse, spec.collapse_linear, age - collapse_start, spec.collapse_power)
+
+        # ===== EXTRA POST-PEAK PRESSURE =====
+        wear_delta += cls._phase_power(np, post_peak, 0.010, deg_age, 1.35)
+
+        # ===== TRACK AND TEAM SCALING =====
+        team_scale = 1.0 + (0.42 * (team_deg_factor - 1.0))
+        wear_scale = track_deg_multiplier * team_scale
+        wear_scale = np.minimum(np.maximum(wear_scale, 0.90), 1.26)
+
+        delta += wear_delta * wear_scale
+
+        return np.maximum(-0.10, delta)
+
+    # ===== STINT COST TABLES =====
+    def get_stint_cost_table(self, compound: str, weekend_role: Optional[str], track_deg_multiplier: float, team_deg_factor: float) -> StintCostTable:
+        # Prefix sums of lap delta per tyre, so a whole stint costs one subtraction.
+        key = (compound, weekend_role, float(track_deg_multiplier), float(team_deg_factor))
+        table = self._stint_tables.get(key)
+
+        if table is None:
+            table = StintCostTable(self, compound, weekend_role, track_deg_multiplier, team_deg_factor)
+            self._stint_tables[key] = table
+
+        return table
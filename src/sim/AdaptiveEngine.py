@@ -0,0 +1,223 @@
+from __future__ import annotations
+import math
+from bisect import bisect_right
+from typing import List
+
+from src.agents.CarAgent import CarAgent
+from src.sim.RaceManager import RaceManager
+
+class AdaptiveStepEngine:
+    # Cars in clear air move event to event inside 1 s macro steps; interacting cars keep 1/120 s ticks.
+    # On a full race this is about 2x the fixed engine (56 s against 118 s for 71 laps of Austria), not
+    # the 20x first aimed for: most cars spend most of a race within overtake range of another car, and
+    # those cars have to stay on fine ticks. src.sim.EngineComparison checks its outcome distributions
+    # against the fixed engine.
+    def __init__(self, race_manager: RaceManager, max_step_s: float = 1.0, interaction_gap_m: float = 25.0, closing_speed_mps: float = 6.0):
+        # ===== ENGINE SETUP =====
+        self.rm = race_manager
+        self.fine_dt = race_manager.dt
+        self.step_ticks = max(1, int(round(max_step_s / self.fine_dt)))
+        self.step_dt = self.step_ticks * self.fine_dt
+        # Cars closer than this at the start of a step could reach dirty-air range before it ends.
+        self.isolation_gap_m = float(interaction_gap_m) + float(closing_speed_mps) * self.step_dt
+        # ===== TRACK EVENTS =====
+        self.event_positions = self.build_event_positions()
+        # ===== SEGMENT SPEED CACHE =====
+        # id(car) -> (key, speed) for the clear-air speed drawn once for the rest of a segment.
+        self.segment_speeds: dict[int, tuple[tuple, float]] = {}
+        # ===== RUN COUNTERS =====
+        self.macro_steps = 0
+        self.fine_tick_equivalents = 0
+        self.grouped_car_steps = 0
+        self.isolated_car_steps = 0
+
+    # ===== TRACK EVENTS =====
+    def build_event_positions(self) -> List[float]:
+        # Every position where a car's speed or race state can change while running alone.
+        rm = self.rm
+        positions = set(rm.segment_starts)
+
+        for zone in rm.drs_zones:
+            for key in ("detection_point", "activation_start", "activation_end"):
+                try:
+                    positions.add(float(zone[key]))
+                except (KeyError, ValueError, TypeError):
+                    continue
+
+        if rm.pit_enabled:
+            positions.add(rm.pit_entry_point)
+
+        return sorted(pos % rm.track_length for pos in positions)
+
+    def distance_to_next_event(self, position: float) -> float:
+        index = bisect_right(self.event_positions, position)
+
+        if index < len(self.event_positions):
+            return self.event_positions[index] - position
+
+        # Nothing left on this lap, so the next event is the finish line.
+        return self.rm.track_length - position
+
+    # ===== FIELD PARTITION =====
+    def partition_field(self, running_order: List[CarAgent]) -> tuple[List[List[CarAgent]], List[CarAgent]]:
+        # Split the running order into interacting groups and cars in clear air.
+        groups: List[List[CarAgent]] = []
+        isolated: List[CarAgent] = []
+        current: List[CarAgent] = []
+
+        for car in running_order:
+            if current and car.gap_ahead < self.isolation_gap_m:
+                current.append(car)
+                continue
+
+            self.close_run(current, groups, isolated)
+            current = [car]
+
+        self.close_run(current, groups, isolated)
+        return groups, isolated
+
+    def close_run(self, run: List[CarAgent], groups: List[List[CarAgent]], isolated: List[CarAgent]) -> None:
+        if not run:
+            return
+
+        # Side-by-side battles only resolve on fine ticks, so those cars never run alone.
+        if len(run) > 1 or run[0].side_by_side_with is not None:
+            groups.append(run)
+        else:
+            isolated.append(run[0])
+
+    # ===== MAIN STEP =====
+    def step(self) -> int:
+        # Advance the race by one macro step and return how many fine ticks it covered.
+        rm = self.rm
+        dt = self.fine_dt
+        start_time = rm.sim_time
+        drs_enabled = rm.is_drs_enabled()
+
+        running_order = rm.apply_spatial_dirty_air()
+        groups, isolated = self.partition_field(running_order)
+        pit_cars = [car for car in rm.cars if car.in_pit_lane and not car.retired]
+
+        # Links from each group to the cars around it stay as measured at the start of the step.
+        outer_links = [((group[0].car_ahead, group[0].gap_ahead), (group[-1].car_behind, group[-1].gap_behind)) for group in groups]
+
+        # Grouped cars tick in field order, the same order the fixed engine uses.
+        grouped_ids = {id(car) for group in groups for car in group}
+        grouped_cars = [car for car in rm.cars if id(car) in grouped_ids]
+
+        # Fine ticks change traffic and pace terms, so those cars draw a fresh segment speed once clear.
+        for car in grouped_cars + pit_cars:
+            self.segment_speeds.pop(id(car), None)
+
+        # Interacting cars and pit-lane cars keep the exact fixed-tick behaviour.
+        if grouped_cars or pit_cars:
+            for tick in range(self.step_ticks):
+                rm.sim_time = start_time + (tick + 1) * dt
+
+                if tick > 0:
+                    for group, (outer_ahead, outer_behind) in zip(groups, outer_links):
+                        group.sort(key=lambda car: rm.get_progress(car), reverse=True)
+                        rm.apply_traffic_relations(group, outer_ahead=outer_ahead, outer_behind=outer_behind)
+
+                for car in grouped_cars:
+                    if not car.retired:
+                        rm.step_car_tick(car, dt, drs_enabled)
+
+                rm.resolve_side_by_side_battles(grouped_cars)
+
+                for car in pit_cars:
+                    if car.retired or not car.in_pit_lane:
+                        continue
+
+                    rm.step_car_tick(car, dt, drs_enabled)
+
+                    if not car.in_pit_lane:
+                        rm.clear_traffic_state(car)
+
+        for car in isolated:
+            if not car.retired:
+                self.advance_isolated_car(car, start_time, drs_enabled)
+
+        rm.sim_time = start_time + self.step_dt
+        rm.update_global_lap_and_events()
+
+        self.macro_steps += 1
+        self.fine_tick_equivalents += self.step_ticks
+        self.grouped_car_steps += len(grouped_cars)
+        self.isolated_car_steps += len(isolated)
+        return self.step_ticks
+
+    def clear_air_share(self) -> float:
+        # Share of running car-steps that were integrated in clear air.
+        total = self.grouped_car_steps + self.isolated_car_steps
+        return self.isolated_car_steps / max(1, total)
+
+    # ===== CLEAR AIR INTEGRATION =====
+    def advance_isolated_car(self, car: CarAgent, start_time: float, drs_enabled: bool) -> None:
+        # Integrate a car in clear air from event to event instead of tick by tick.
+        rm = self.rm
+        car.tick_cooldowns(self.step_dt)
+        elapsed = 0.0
+
+        while self.step_dt - elapsed > 1e-9:
+            if car.retired or car.lap_count >= rm.total_laps:
+                return
+
+            remaining = self.step_dt - elapsed
+
+            if car.in_pit_lane:
+                # A stop that starts inside the step runs the rest of the step on fine ticks.
+                tick_dt = min(self.fine_dt, remaining)
+                rm.sim_time = start_time + elapsed + tick_dt
+                rm.handle_pit_lane_tick(car, tick_dt)
+                elapsed += tick_dt
+
+                if not car.in_pit_lane:
+                    rm.clear_traffic_state(car)
+                continue
+
+            elapsed += self.advance_to_next_event(car, remaining, start_time + elapsed, drs_enabled)
+
+    def advance_to_next_event(self, car: CarAgent, remaining: float, chunk_start_time: float, drs_enabled: bool) -> float:
+        # Run one constant-speed chunk up to the next track event or the end of the step.
+        rm = self.rm
+        segment_index = rm.get_segment_index_for_car(car)
+        segment = rm.segment_data[segment_index]
+        seg_type = rm.segment_types[segment_index]
+
+        car.update_drs_active(drs_enabled=drs_enabled, segment_type=seg_type, track_position=car.track_position, drs_windows=rm.marker_schedule.windows_by_segment[segment_index], in_window_fn=rm.is_pos_in_circular_window)
+
+        event_distance = self.distance_to_next_event(car.track_position)
+        speed = self.segment_speed(car, segment_index, segment)
+
+        if speed <= 0.0:
+            car.last_speed_mps = 0.0
+            car.current_lap_time += remaining
+            return remaining
+
+        chunk_dt = min(remaining, event_distance / speed)
+        rm.sim_time = chunk_start_time + chunk_dt
+        rm.advance_car_on_track(car, speed, chunk_dt, drs_enabled)
+
+        return chunk_dt
+
+    def segment_speed(self, car: CarAgent, segment_index: int, segment: dict) -> float:
+        # Clear-air speed is constant through a segment apart from its noise, so it is drawn once for
+        # the rest of the segment and reused across macro steps while nothing it depends on changes.
+        rm = self.rm
+        key = (car.lap_count, segment_index, car.drs_active, car.instruction, car.traffic_penalty, car.slipstream_bonus, rm.track_state, rm.evolution_level, car.tyre_state.age_laps)
+
+        cached = self.segment_speeds.get(id(car))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        # The one draw stands in for every fine tick left in the segment, so its noise is
+        # shrunk to match the variance of the averaged per-tick draws.
+        segment_distance = max(0.0, rm.segment_ends[segment_index] - car.track_position)
+        estimated_speed = car.last_speed_mps if car.last_speed_mps > 1.0 else rm.track_length / max(rm.base_lap_time, 1.0)
+        estimated_ticks = segment_distance / estimated_speed / self.fine_dt
+        noise_scale = 1.0 / math.sqrt(max(1.0, estimated_ticks))
+
+        speed = rm.compute_car_speed(car, segment, noise_scale=noise_scale)
+        self.segment_speeds[id(car)] = (key, speed)
+        return speed
@@ -0,0 +1,158 @@
+from __future__ import annotations
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import List, Optional
+
+from src.sim.ConfigRegistry import CONFIGS, install_config_snapshot
+from src.sim.MonteCarlo import RaceSummary, summarise_race
+from src.sim.RaceLog import NullRaceLog
+from src.sim.RaceSnapshot import RaceSnapshot
+
+# ===== FORK SUPPORT =====
+# os.fork gives each branch a copy-on-write image of the live race; elsewhere branches start from a snapshot.
+FORK_AVAILABLE = hasattr(os, "fork") and "fork" in multiprocessing.get_all_start_methods()
+
+# ===== BRANCH DATA CLASSES =====
+@dataclass
+class Branch:
+    label: str
+    car_id: str
+    # Tyre role for a stop ("SOFT", "MEDIUM", "HARD"); None leaves the car's stops to its team.
+    tyre_role: Optional[str] = None
+    # The stop is requested once the car is on this lap; None requests it straight away.
+    pit_on_lap: Optional[int] = None
+    # Team instruction held to the flag, e.g. "PUSH"; None leaves instructions to the team.
+    instruction: Optional[str] = None
+
+@dataclass
+class BranchResult:
+    label: str
+    car_id: str
+    position: Optional[int]
+    total_time: Optional[float]
+    summary: RaceSummary
+
+# ===== BRANCH RUN =====
+def run_branch(rm, branch: Branch) -> BranchResult:
+    # Applies one decision to one car and steps this copy of the race to the flag.
+    rm.race_log = NullRaceLog()
+    rm.log_filepath = None
+    rm.lap_store = None
+
+    car = next((car for car in rm.cars if car.car_id == branch.car_id), None)
+    if car is None:
+        raise ValueError(f"Unknown car '{branch.car_id}'")
+    if branch.tyre_role is not None and branch.tyre_role not in rm.compound_map:
+        raise ValueError(f"Unknown tyre role '{branch.tyre_role}', expected one of {list(rm.compound_map)}")
+
+    stop_pending = branch.tyre_role is not None
+    dt = rm.dt
+    ticks = 0
+    start = time.perf_counter()
+
+    while not rm.race_finished:
+        if stop_pending and (branch.pit_on_lap is None or car.lap_count + 1 >= branch.pit_on_lap):
+            compound = rm.compound_map[branch.tyre_role]
+            car.pit(compound, branch.tyre_role)
+            if car.pending_pit:
+                # A stop the team had already called takes the branch's tyre instead.
+                car.pit_compound = compound
+                car.next_role = branch.tyre_role
+                stop_pending = False
+            elif car.retired:
+                stop_pending = False
+
+        # Teams reset instructions when they decide, so a held instruction is re-applied.
+        if branch.instruction is not None and car.instruction != branch.instruction:
+            car.apply_team_instruction(branch.instruction)
+
+        rm.step_tick(dt)
+        ticks += 1
+
+    summary, _ = summarise_race(rm, rm.seed, ticks, time.perf_counter() - start)
+    position = summary.finishing_order.index(car.car_id) + 1 if car.car_id in summary.finishing_order else None
+    return BranchResult(
+        label=branch.label,
+        car_id=car.car_id,
+        position=position,
+        total_time=summary.total_times.get(car.car_id),
+        summary=summary,
+    )
+
+def run_branch_in_child(rm, branch: Branch, conn) -> None:
+    # Forked worker body: the race it mutates is the child's own copy-on-write image.
+    try:
+        payload = run_branch(rm, branch)
+    except Exception as error:
+        payload = error
+
+    conn.send(payload)
+    conn.close()
+
+def run_snapshot_branch(snapshot_bytes: bytes, branch: Branch) -> BranchResult:
+    # Pool worker for platforms without fork.
+    return run_branch(RaceSnapshot.from_bytes(snapshot_bytes).fork(), branch)
+
+# ===== EVALUATOR =====
+class BranchEvaluator:
+    def __init__(self, race_manager, max_workers: int | None = None, use_fork: bool = FORK_AVAILABLE):
+        # ===== EVALUATION SETUP =====
+        self.rm = race_manager
+        self.max_workers = max(1, max_workers if max_workers is not None else (os.cpu_count() or 1))
+        self.use_fork = use_fork and FORK_AVAILABLE
+
+    def evaluate(self, branches: List[Branch]) -> List[BranchResult]:
+        # Every branch continues from the race as it stands now; results come back in branch order.
+        if not branches:
+            return []
+        if self.use_fork:
+            return self.evaluate_forked(branches)
+        return self.evaluate_from_snapshot(branches)
+
+    def evaluate_forked(self, branches: List[Branch]) -> List[BranchResult]:
+        # One forked process per branch, at most max_workers alive. Nothing is pickled on the way in;
+        # only the small result comes back over a pipe.
+        context = multiprocessing.get_context("fork")
+        results: List[Optional[BranchResult]] = [None] * len(branches)
+        running = {}
+        next_branch = 0
+        # Buffered log text would otherwise be inherited and flushed twice.
+        self.rm.race_log.flush()
+
+        while next_branch < len(branches) or running:
+            while next_branch < len(branches) and len(running) < self.max_workers:
+                reader, writer = context.Pipe(duplex=False)
+                process = context.Process(target=run_branch_in_child, args=(self.rm, branches[next_branch], writer), daemon=True)
+                process.start()
+                writer.close()
+                running[reader] = (next_branch, process)
+                next_branch += 1
+
+            for reader in wait(list(running)):
+                index, process = running.pop(reader)
+                try:
+                    payload = reader.recv()
+                except EOFError:
+                    payload = RuntimeError(f"Branch '{branches[index].label}' worker exited with code {process.exitcode}")
+                reader.close()
+                process.join()
+
+                if isinstance(payload, Exception):
+                    for _, other in running.values():
+                        other.terminate()
+                    raise payload
+                results[index] = payload
+
+        return results
+
+    def evaluate_from_snapshot(self, branches: List[Branch]) -> List[BranchResult]:
+        snapshot_bytes = self.rm.snapshot().to_bytes()
+        workers = min(self.max_workers, len(branches))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=install_config_snapshot, initargs=(CONFIGS.snapshot(),)) as executor:
+            futures = [executor.submit(run_snapshot_branch, snapshot_bytes, branch) for branch in branches]
+            return [future.result() for future in futures]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+from typing import Any, List, Mapping, Optional, Tuple
+
+from src.sim.MarkerSchedule import MarkerSchedule
+
+# ===== CACHE KEYS =====
+def characteristic_overrides(circuit_characteristics: Optional[Mapping[str, Any]]) -> Tuple[Tuple[str, Any], ...]:
+    # Overrides as a hashable key; "Default" means keep the circuit's own value.
+    if not circuit_characteristics:
+        return ()
+    return tuple(sorted((name, value) for name, value in circuit_characteristics.items() if value != "Default"))
+
+
+class CompiledCircuit:
+    # Everything a race derives from the circuit config alone. Built and checked once per
+    # (grand prix, characteristic overrides) and shared read-only by every race on it.
+    def __init__(self, grandprix: str, circuit_data: Mapping[str, Any], overrides: Tuple[Tuple[str, Any], ...] = ()):
+        # ===== TRACK MODEL =====
+        self.grandprix = grandprix
+        self.overrides = overrides
+        self.track_length = float(circuit_data["track_model"]["track_length"])
+        self.raw_segments = circuit_data["track_model"]["segments"]
+        # ===== CIRCUIT CHARACTERISTICS =====
+        characteristics = dict(circuit_data.get("characteristics", {}))
+        characteristics.update(overrides)
+        self.characteristics = characteristics
+        abrasion = float(characteristics.get("asphalt_abrasion", 3))
+        tyre_stress = float(characteristics.get("tyre_stress", 3))
+        self.track_deg_multiplier = 1.0 + 0.03 * (abrasion - 3.0) + 0.03 * (tyre_stress - 3.0)
+        self.track_deg_multiplier = min(max(self.track_deg_multiplier, 0.80), 1.25)
+        traction = float(characteristics.get("traction", 3))
+        downforce = float(characteristics.get("downforce", 3))
+        self.overtake_difficulty = 1.0 + 0.05 * (3.0 - min(traction, downforce))
+        # ===== PIT LANE GEOMETRY =====
+        pit_cfg = circuit_data.get("pit_lane", {}) or {}
+        self.pit_enabled = bool(pit_cfg.get("enabled", False))
+        self.pit_entry_point = float(pit_cfg.get("pit_entry_point", 0.0))
+        self.pit_exit_point = float(pit_cfg.get("pit_exit_point", 0.0))
+        self.pit_lane_distance = float(pit_cfg.get("pit_lane_distance", 0.0))
+        # None when the circuit leaves the limit to the race's own pit_speed.
+        self.pit_speed_limit = float(pit_cfg["pit_speed_limit_mps"]) if "pit_speed_limit_mps" in pit_cfg else None
+        self.pit_service_time_mean = float(pit_cfg.get("service_time_mean", 2.5))
+        self.pit_service_time_std = float(pit_cfg.get("service_time_std", 0.3))
+        self.pit_box_position_m = float(pit_cfg.get("pit_box_position_m", self.pit_lane_distance * 0.45))
+        self.crosses_finish = self.pit_entry_point > self.pit_exit_point
+        if self.crosses_finish:
+            self.pit_line_position_m = self.track_length - self.pit_entry_point
+            if self.pit_line_position_m > self.pit_lane_distance:
+                self.pit_line_position_m = None
+        else:
+            self.pit_line_position_m = None
+        # ===== SEGMENT COLUMNS =====
+        self.segment_boundaries = self.build_segment_boundaries()
+        self.segment_starts = tuple(float(seg["start"]) for seg in self.segment_boundaries)
+        self.segment_ends = tuple(float(seg["end"]) for seg in self.segment_boundaries)
+        self.segment_data = tuple(seg["data"] for seg in self.segment_boundaries)
+        self.segment_types = tuple(seg["data"].get("type", "straight") for seg in self.segment_boundaries)
+        self.segment_severities = tuple(min(max(float(seg["data"].get("severity", 0.5)), 0.0), 1.0) for seg in self.segment_boundaries)
+        self.segment_lengths = tuple(float(seg["data"]["length"]) for seg in self.segment_boundaries)
+        # ===== DRS ZONES + MARKERS =====
+        self.drs_zones = self.normalise_drs_zones(circuit_data.get("drs_zones", []))
+        self.marker_schedule = MarkerSchedule(self.track_length, self.drs_zones, self.pit_entry_point if self.pit_enabled else None, self.segment_starts, self.segment_ends)
+
+    # ===== SEGMENTS =====
+    def build_segment_boundaries(self) -> List[dict]:
+        # Turn the raw segment list into start / end ranges so position lookups are simple.
+        boundaries = []
+        current_start = 0.0
+
+        for seg in self.raw_segments:
+            start = current_start
+            end = start + float(seg["length"])
+
+            boundaries.append({
+                "start": start,
+                "end": end,
+                "data": seg,
+            })
+
+            current_start = end
+
+        if abs(current_start - self.track_length) > 0.01:
+            raise ValueError(f"Segment lengths ({current_start}) do not match track_length ({self.track_length})")
+
+        return boundaries
+
+    # ===== DRS ZONE NORMALISATION =====
+    def normalise_drs_zones(self, drs_zones: List[dict]) -> List[dict]:
+        # Clamp DRS activation windows so they sit on straights only.
+        if not drs_zones:
+            return list(drs_zones)
+
+        straight_intervals = [(start, end) for start, end, seg_type in zip(self.segment_starts, self.segment_ends, self.segment_types) if seg_type == "straight"]
+
+        if not straight_intervals:
+            return list(drs_zones)
+
+        def overlap_len(a0: float, a1: float, b0: float, b1: float) -> float:
+            return max(0.0, min(a1, b1) - max(a0, b0))
+
+        def window_to_intervals(start: float, end: float) -> list[tuple[float, float]]:
+            if end >= start:
+                return [(start, end)]
+            return [(start, float(self.track_length)), (0.0, end)]
+
+        new_zones = []
+
+        for zone in drs_zones:
+            try:
+                a0 = float(zone["activation_start"])
+                a1 = float(zone["activation_end"])
+            except (KeyError, ValueError, TypeError):
+                new_zones.append(zone)
+                continue
+
+            if a0 == a1:
+                new_zones.append(zone)
+                continue
+
+            best = None
+
+            for wa0, wa1 in window_to_intervals(a0, a1):
+                for s0, s1 in straight_intervals:
+                    overlap = overlap_len(wa0, wa1, s0, s1)
+                    if overlap > 0:
+                        new_start = max(wa0, s0)
+                        new_end = min(wa1, s1)
+
+                        if best is None or overlap > best[0]:
+                            best = (overlap, new_start, new_end)
+
+            if best is None:
+                new_zones.append(zone)
+                continue
+
+            _, new_start, new_end = best
+            updated_zone = dict(zone)
+            updated_zone["activation_start"] = new_start
+            updated_zone["activation_end"] = new_end
+            new_zones.append(updated_zone)
+
+        return new_zones
+
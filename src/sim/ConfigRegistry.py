@@ -0,0 +1,166 @@
+from __future__ import annotations
+import json
+import os
+import pickle
+from typing import Any, Dict, Optional
+
+from src.models.TyreModel import TyreModel
+from src.sim.CompiledCircuit import CompiledCircuit, characteristic_overrides
+
+# ===== CONFIG FILES =====
+CONFIG_PATHS = {
+    "circuits": "configs/circuits.json",
+    "teams": "configs/teams.json",
+    "tyre_compounds": "configs/tyre_compounds.json",
+    "tyres": "configs/tyres.json",
+}
+
+REQUIRED_CIRCUIT_KEYS = ("total_laps", "base_lap_time", "lap_time_std", "pit_loss", "track_model")
+
+# ===== READ-ONLY VALUES =====
+class FrozenDict(dict):
+    # A dict that refuses writes. It stays a real dict so isinstance checks, json.dump and
+    # pickling keep working; copy() hands back an ordinary mutable dict.
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Config data is read-only; copy() it before changing it")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+def freeze(value: Any) -> Any:
+    # Parsed JSON to nested FrozenDicts and tuples.
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ConfigRegistry:
+    def __init__(self, paths: Optional[Dict[str, str]] = None):
+        # ===== SOURCES =====
+        self.paths = dict(CONFIG_PATHS if paths is None else paths)
+        # ===== PARSED DOCUMENTS =====
+        self.documents: Dict[str, Any] = {}
+        # path -> (mtime, frozen document) for saved race configs, re-read only when the file changes
+        self.json_cache: Dict[str, tuple[float, Any]] = {}
+        self.shared_tyre_model: Optional[TyreModel] = None
+        # (grand prix, characteristic overrides) -> compiled track model shared by every race on it
+        self.compiled_circuits: Dict[tuple, CompiledCircuit] = {}
+
+    # ===== LOADING =====
+    def document(self, name: str) -> Any:
+        # Each config file is parsed, validated and frozen once per process.
+        if name not in self.documents:
+            with open(self.paths[name], encoding="utf-8") as file:
+                data = json.load(file)
+
+            self.validate(name, data)
+            self.documents[name] = freeze(data)
+
+        return self.documents[name]
+
+    def load_json(self, filepath: str) -> Any:
+        mtime = os.path.getmtime(filepath)
+        cached = self.json_cache.get(filepath)
+
+        if cached is None or cached[0] != mtime:
+            with open(filepath, "r", encoding="utf-8") as file:
+                cached = (mtime, freeze(json.load(file)))
+            self.json_cache[filepath] = cached
+
+        return cached[1]
+
+    def preload(self) -> None:
+        for name in self.paths:
+            self.document(name)
+        self.tyre_model()
+
+    # ===== VALIDATION =====
+    def validate(self, name: str, data: Any) -> None:
+        if name == "circuits":
+            for grandprix, circuit in data.items():
+                missing = [key for key in REQUIRED_CIRCUIT_KEYS if key not in circuit]
+                if missing:
+                    raise ValueError(f"Circuit '{grandprix}' in {self.paths[name]} is missing {missing}")
+
+                track_model = circuit["track_model"]
+                if "track_length" not in track_model or not track_model.get("segments"):
+                    raise ValueError(f"Circuit '{grandprix}' in {self.paths[name]} needs a track_length and segments")
+
+        elif name == "teams":
+            for season, teams in data.items():
+                for team_name, team in teams.items():
+                    if "performance" not in team or "drivers" not in team:
+                        raise ValueError(f"Team '{team_name}' ({season}) in {self.paths[name]} needs performance and drivers")
+
+        elif name == "tyre_compounds":
+            if "season" not in data:
+                raise ValueError(f"{self.paths[name]} has no 'season' table")
+
+        elif name == "tyres":
+            if "tyres" not in data:
+                raise ValueError(f"{self.paths[name]} has no 'tyres' table")
+
+    # ===== TYPED ACCESS =====
+    def circuits(self) -> FrozenDict:
+        return self.document("circuits")
+
+    def circuit(self, grandprix: str) -> FrozenDict:
+        circuits = self.circuits()
+        if grandprix not in circuits:
+            raise ValueError(f"Circuit '{grandprix}' not found in {self.paths['circuits']}")
+        return circuits[grandprix]
+
+    def season_teams(self, season: str) -> FrozenDict:
+        return self.document("teams")[season]
+
+    def compound_map(self, season: str, grandprix: str) -> FrozenDict:
+        return self.document("tyre_compounds")["season"][season][grandprix]["compounds"]
+
+    def tyre_model(self) -> TyreModel:
+        # Tyre maths only depends on the spec file, so every race in the process shares one model
+        # and its resolved-spec, curve and stint-table caches.
+        if self.shared_tyre_model is None:
+            self.shared_tyre_model = TyreModel(self.document("tyres"))
+        return self.shared_tyre_model
+
+    def compiled_circuit(self, grandprix: str, circuit_characteristics: Optional[Dict[str, Any]] = None) -> CompiledCircuit:
+        # Segments, DRS zones and pit geometry are compiled and checked once per circuit setup.
+        key = (grandprix, characteristic_overrides(circuit_characteristics))
+        if key not in self.compiled_circuits:
+            self.compiled_circuits[key] = CompiledCircuit(grandprix, self.circuit(grandprix), key[1])
+        return self.compiled_circuits[key]
+
+    # ===== SNAPSHOTS =====
+    def snapshot(self) -> bytes:
+        # Every parsed document, plus the circuits compiled so far, as one pickle for handing to worker processes.
+        self.preload()
+        state = {"paths": self.paths, "documents": self.documents, "compiled_circuits": self.compiled_circuits}
+        return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def restore(self, blob: bytes) -> None:
+        state = pickle.loads(blob)
+        self.paths = dict(state["paths"])
+        self.documents = dict(state["documents"])
+        self.compiled_circuits = dict(state.get("compiled_circuits", {}))
+        self.shared_tyre_model = None
+
+    def save_snapshot(self, filepath: str) -> None:
+        with open(filepath, "wb") as file:
+            file.write(self.snapshot())
+
+    def load_snapshot(self, filepath: str) -> None:
+        with open(filepath, "rb") as file:
+            self.restore(file.read())
+
+
+# ===== PROCESS-WIDE REGISTRY =====
+CONFIGS = ConfigRegistry()
+
+def install_config_snapshot(blob: bytes) -> None:
+    # ProcessPoolExecutor initializer: workers start from the parent's parsed configs.
+    CONFIGS.restore(blob)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import argparse
+import math
+import statistics
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.sim.MonteCarlo import MonteCarloEngine, MonteCarloReport
+
+# ===== TEST SETTINGS =====
+DEFAULT_ALPHA = 0.05
+# Below this many values on either side a distribution is reported but not tested.
+MIN_SAMPLES = 10
+
+# ===== KOLMOGOROV-SMIRNOV =====
+def ks_two_sample(a: List[float], b: List[float]) -> tuple[float, float]:
+    # Largest gap between the two empirical CDFs and its asymptotic p-value (Stephens' small-sample
+    # correction). Ties are stepped together, so on discrete data such as finishing positions the
+    # p-value is conservative.
+    a, b = sorted(a), sorted(b)
+    n, m = len(a), len(b)
+    statistic = 0.0
+
+    for value in sorted(set(a) | set(b)):
+        statistic = max(statistic, abs(bisect_right(a, value) / n - bisect_right(b, value) / m))
+
+    effective_n = math.sqrt(n * m / (n + m))
+    lam = (effective_n + 0.12 + 0.11 / effective_n) * statistic
+    if lam < 1e-3:
+        return statistic, 1.0
+
+    p_value = 2.0 * sum((-1) ** (j - 1) * math.exp(-2.0 * j * j * lam * lam) for j in range(1, 101))
+    return statistic, min(max(p_value, 0.0), 1.0)
+
+def ks_critical_value(n: int, m: int, alpha: float) -> float:
+    # Smallest CDF gap the test can flag at this alpha: the resolution of the comparison.
+    return math.sqrt(-0.5 * math.log(alpha / 2.0)) * math.sqrt((n + m) / (n * m))
+
+# ===== COMPARISON DATA CLASSES =====
+@dataclass
+class DistributionTest:
+    label: str
+    baseline_n: int
+    candidate_n: int
+    baseline_mean: float
+    candidate_mean: float
+    statistic: float
+    p_value: float
+
+@dataclass
+class EngineComparison:
+    sim_filepath: str
+    baseline: str
+    candidate: str
+    races: int
+    alpha: float = DEFAULT_ALPHA
+    tests: List[DistributionTest] = field(default_factory=list)
+    baseline_wall_s: float = 0.0
+    candidate_wall_s: float = 0.0
+
+    @property
+    def test_alpha(self) -> float:
+        # Bonferroni: the family of tests as a whole rejects with probability alpha at most.
+        return self.alpha / max(1, len(self.tests))
+
+    @property
+    def rejected(self) -> List[DistributionTest]:
+        return [test for test in self.tests if test.p_value < self.test_alpha]
+
+    @property
+    def equivalent(self) -> bool:
+        # "Equivalent" here means no distribution differs detectably at this many races; the
+        # detectable CDF gap is reported next to the verdict so the claim has a stated resolution.
+        return bool(self.tests) and not self.rejected
+
+    @property
+    def speedup(self) -> float:
+        return self.baseline_wall_s / max(self.candidate_wall_s, 1e-9)
+
+# ===== SAMPLES =====
+def finishing_positions(report: MonteCarloReport) -> dict[str, List[float]]:
+    return {car_id: [float(position) for position in dist.finish_positions] for car_id, dist in report.cars.items()}
+
+def gaps_to_winner(report: MonteCarloReport) -> dict[int, List[float]]:
+    # Gap from the winner to the car classified in each position, one sample per race.
+    gaps: dict[int, List[float]] = {}
+
+    for summary in report.summaries:
+        if not summary.finishing_order:
+            continue
+
+        winner_time = summary.total_times[summary.finishing_order[0]]
+        for position, car_id in enumerate(summary.finishing_order[1:], start=2):
+            gaps.setdefault(position, []).append(summary.total_times[car_id] - winner_time)
+
+    return gaps
+
+def winning_times(report: MonteCarloReport) -> List[float]:
+    return [summary.total_times[summary.finishing_order[0]] for summary in report.summaries if summary.finishing_order]
+
+def compare_samples(label: str, baseline: Optional[List[float]], candidate: Optional[List[float]]) -> Optional[DistributionTest]:
+    if not baseline or not candidate or len(baseline) < MIN_SAMPLES or len(candidate) < MIN_SAMPLES:
+        return None
+
+    statistic, p_value = ks_two_sample(baseline, candidate)
+    return DistributionTest(
+        label=label,
+        baseline_n=len(baseline),
+        candidate_n=len(candidate),
+        baseline_mean=statistics.fmean(baseline),
+        candidate_mean=statistics.fmean(candidate),
+        statistic=statistic,
+        p_value=p_value,
+    )
+
+# ===== RUN =====
+def compare_engines(sim_filepath: str, n_races: int, base_seed: int = 0, baseline: str = "fixed", candidate: str = "adaptive", max_workers: int | None = None, rng_mode: str = "shared", alpha: float = DEFAULT_ALPHA) -> EngineComparison:
+    # Runs the same seeds on both engines and tests every car's finishing-position distribution,
+    # the gap-to-winner distribution at every classified position and the winning time. The engines
+    # draw their noise differently, so races are compared as distributions, never seed by seed.
+    reports = {}
+    walls = {}
+
+    for engine in (baseline, candidate):
+        report = MonteCarloEngine(sim_filepath, n_races=n_races, base_seed=base_seed, max_workers=max_workers, engine=engine, rng_mode=rng_mode).run()
+        reports[engine] = report
+        walls[engine] = sum(summary.wall_time_s for summary in report.summaries)
+
+    base_report, cand_report = reports[baseline], reports[candidate]
+    comparison = EngineComparison(sim_filepath=sim_filepath, baseline=baseline, candidate=candidate, races=n_races, alpha=alpha, baseline_wall_s=walls[baseline], candidate_wall_s=walls[candidate])
+
+    base_positions, cand_positions = finishing_positions(base_report), finishing_positions(cand_report)
+    for car_id in sorted(set(base_positions) | set(cand_positions)):
+        comparison.tests.append(compare_samples(f"position {car_id}", base_positions.get(car_id), cand_positions.get(car_id)))
+
+    base_gaps, cand_gaps = gaps_to_winner(base_report), gaps_to_winner(cand_report)
+    for position in sorted(set(base_gaps) | set(cand_gaps)):
+        comparison.tests.append(compare_samples(f"gap P{position}", base_gaps.get(position), cand_gaps.get(position)))
+
+    comparison.tests.append(compare_samples("winning time", winning_times(base_report), winning_times(cand_report)))
+    comparison.tests = [test for test in comparison.tests if test is not None]
+    return comparison
+
+# ===== OUTPUT =====
+def print_comparison(comparison: EngineComparison) -> None:
+    print(f"{comparison.candidate} vs {comparison.baseline}: {comparison.races} seeded races of {comparison.sim_filepath}\n")
+    print(f"{'Distribution':<16} | {comparison.baseline + ' mean':>12} | {comparison.candidate + ' mean':>13} | {'KS D':>6} | {'p':>7}")
+
+    for test in comparison.tests:
+        flag = "  *" if test.p_value < comparison.test_alpha else ""
+        print(f"{test.label:<16} | {test.baseline_mean:>12.3f} | {test.candidate_mean:>13.3f} | {test.statistic:>6.3f} | {test.p_value:>7.4f}{flag}")
+
+    critical = ks_critical_value(comparison.races, comparison.races, comparison.test_alpha)
+    print(f"\n{len(comparison.tests)} tests at alpha {comparison.alpha} (Bonferroni {comparison.test_alpha:.5f} each); detectable CDF gap {critical:.3f}")
+    print(f"Rejected: {len(comparison.rejected)} -> {'no detectable difference' if comparison.equivalent else 'distributions differ'}")
+    print(f"Wall time: {comparison.baseline} {comparison.baseline_wall_s:.1f} s, {comparison.candidate} {comparison.candidate_wall_s:.1f} s, speedup {comparison.speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that two tick engines give the same race outcome distributions.")
+    parser.add_argument("config", help="Path to a saved RaceConfig JSON file")
+    parser.add_argument("--races", type=int, default=200, help="Seeded races per engine")
+    parser.add_argument("--base-seed", type=int, default=0, help="Seed of the first race; later races count up from here")
+    parser.add_argument("--baseline", choices=("fixed", "adaptive", "vector", "batch"), default="fixed", help="Reference engine")
+    parser.add_argument("--candidate", choices=("fixed", "adaptive", "vector", "batch"), default="adaptive", help="Engine under test")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to the CPU count)")
+    parser.add_argument("--rng", choices=("shared", "streams"), default="shared", help="Shared generator per race or counter-based streams per car")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Family-wise significance level")
+    args = parser.parse_args()
+
+    print_comparison(compare_engines(args.config, n_races=args.races, base_seed=args.base_seed, baseline=args.baseline, candidate=args.candidate, max_workers=args.workers, rng_mode=args.rng, alpha=args.alpha))
@@ -0,0 +1,173 @@
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.sim.RaceManager import RaceManager
+from src.sim.AdaptiveEngine import AdaptiveStepEngine
+
+# ===== ENGINE MODES =====
+ENGINE_MODES = ("fixed", "adaptive", "vector")
+
+# ===== RESULT DATA CLASSES =====
+@dataclass
+class ClassifiedCar:
+    position: int
+    car_id: str
+    team_id: str
+    status: str                 # FINISHED / DNF
+    total_time: float
+    gap_to_winner: Optional[float]
+    laps_completed: int
+    pit_stops: int
+
+@dataclass
+class RaceResult:
+    grandprix: str
+    season: str
+    seed: int
+    total_laps: int
+    engine: str = "fixed"
+    classification: List[ClassifiedCar] = field(default_factory=list)
+    lap_records: dict[str, list[dict]] = field(default_factory=dict)
+    sim_time: float = 0.0
+    ticks: int = 0
+    wall_time_s: float = 0.0
+    completed: bool = True
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / max(self.wall_time_s, 1e-9)
+
+    def to_dict(self) -> dict:
+        return {
+            "grandprix": self.grandprix,
+            "season": self.season,
+            "seed": self.seed,
+            "total_laps": self.total_laps,
+            "engine": self.engine,
+            "completed": self.completed,
+            "sim_time": self.sim_time,
+            "ticks": self.ticks,
+            "wall_time_s": self.wall_time_s,
+            "ticks_per_second": self.ticks_per_second,
+            "classification": [vars(entry) for entry in self.classification],
+            "lap_records": self.lap_records,
+        }
+
+
+class HeadlessRunner:
+    def __init__(self, race_manager: RaceManager, max_ticks: int | None = None, engine: str = "fixed"):
+        # ===== RUN SETUP =====
+        if engine not in ENGINE_MODES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINE_MODES}")
+
+        self.rm = race_manager
+        self.max_ticks = None if max_ticks is None else max(0, int(max_ticks))
+        self.engine = engine
+        # Fine 1/120 s ticks advanced, so throughput is comparable across engines.
+        self.ticks = 0
+
+    # ===== RACE START =====
+    def start_race(self) -> None:
+        # Mirror the start sequence the Simulation screen runs before its first tick.
+        self.rm.write_to_log("Simulation started.")
+        self.rm.broadcast_public_signals()
+
+        for team in self.rm.teams:
+            team.decide()
+
+    # ===== MAIN LOOP =====
+    def run(self) -> RaceResult:
+        # Step the race as fast as possible with no render loop in between ticks.
+        self.start_race()
+
+        rm = self.rm
+        start = time.perf_counter()
+
+        if self.engine == "adaptive":
+            adaptive = AdaptiveStepEngine(rm)
+
+            while not rm.race_finished:
+                if self.max_ticks is not None and self.ticks >= self.max_ticks:
+                    break
+
+                self.ticks += adaptive.step()
+
+        elif self.engine == "vector":
+            # NumPy is only needed for this engine, so it is imported on demand.
+            from src.sim.VectorEngine import VectorizedRaceEngine
+
+            vector = VectorizedRaceEngine(rm)
+            dt = rm.dt
+
+            while not rm.race_finished:
+                if self.max_ticks is not None and self.ticks >= self.max_ticks:
+                    break
+
+                vector.step_tick(dt)
+                self.ticks += 1
+
+            vector.sync_to_cars()
+
+        else:
+            dt = rm.dt
+            step_tick = rm.step_tick
+
+            while not rm.race_finished:
+                if self.max_ticks is not None and self.ticks >= self.max_ticks:
+                    break
+
+                step_tick(dt)
+                self.ticks += 1
+
+        wall_time = time.perf_counter() - start
+
+        if rm.race_finished:
+            rm.log_final_classification()
+
+        rm.close_outputs()
+
+        return self.build_result(wall_time)
+
+    # ===== RESULT BUILD =====
+    def build_result(self, wall_time_s: float) -> RaceResult:
+        rm = self.rm
+        classified, retired = rm.build_final_classification()
+        winner_time = classified[0].total_time if classified else None
+
+        classification: List[ClassifiedCar] = []
+
+        for position, car in enumerate(classified + retired, start=1):
+            finished = not car.retired
+
+            gap = None
+            if finished and winner_time is not None:
+                gap = max(0.0, car.total_time - winner_time)
+
+            classification.append(
+                ClassifiedCar(
+                    position=position,
+                    car_id=car.car_id,
+                    team_id=car.team_id,
+                    status="FINISHED" if finished else "DNF",
+                    total_time=car.total_time,
+                    gap_to_winner=gap,
+                    laps_completed=len(car.completed_laps),
+                    pit_stops=car.pit_stops_made,
+                )
+            )
+
+        return RaceResult(
+            grandprix=rm.grandprix,
+            season=rm.season,
+            seed=rm.seed,
+            total_laps=rm.total_laps,
+            engine=self.engine,
+            classification=classification,
+            lap_records={car.car_id: [record.to_dict() for record in car.completed_laps] for car in rm.cars},
+            sim_time=rm.sim_time,
+            ticks=self.ticks,
+            wall_time_s=wall_time_s,
+            completed=rm.race_finished,
+        )
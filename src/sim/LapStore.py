@@ -0,0 +1,104 @@
+from __future__ import annotations
+import json
+import struct
+from typing import List
+
+from src.agents.CarAgent import LapRecord
+
+# ===== RECORD LAYOUT =====
+# One fixed-width little-endian row per completed lap, in the field order below.
+# The same layout is written as the .npy header, so np.load can memory-map the file.
+LAP_FIELDS = [
+    ("car", "<u2", "H"),
+    ("lap", "<u2", "H"),
+    ("lap_time", "<f8", "d"),
+    ("total_time", "<f8", "d"),
+    ("compound", "|S12", "12s"),
+    ("weekend_role", "|S8", "8s"),
+    ("tyre_age", "<f8", "d"),
+    ("stint_id", "<u2", "H"),
+]
+
+LAP_RECORD = struct.Struct("<" + "".join(code for _, _, code in LAP_FIELDS))
+# Byte width of each text field; struct would silently cut longer values.
+TEXT_WIDTHS = {name: int(code[:-1]) for name, _, code in LAP_FIELDS if code.endswith("s")}
+
+# .npy v1.0 preamble (magic, version, header length) plus a header padded to a fixed size,
+# so the row count can be patched in place when the store is closed.
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_BYTES = 256
+
+def npy_header(rows: int) -> bytes:
+    descr = [(name, dtype) for name, dtype, _ in LAP_FIELDS]
+    header = f"{{'descr': {descr!r}, 'fortran_order': False, 'shape': ({rows},), }}"
+    header_len = NPY_HEADER_BYTES - len(NPY_MAGIC) - 2
+    header = header.ljust(header_len - 1) + "\n"
+    return NPY_MAGIC + struct.pack("<H", header_len) + header.encode("latin1")
+
+def encode_text(name: str, value) -> bytes:
+    # None (e.g. a tyre with no weekend role) is stored as an empty field.
+    encoded = b"" if value is None else str(value).encode("ascii")
+
+    if len(encoded) > TEXT_WIDTHS[name]:
+        raise ValueError(f"Lap store field '{name}' holds {TEXT_WIDTHS[name]} bytes, got {value!r}")
+
+    return encoded
+
+def sidecar_path(filepath: str) -> str:
+    return filepath + ".json"
+
+class LapStoreWriter:
+    def __init__(self, filepath: str, car_ids: List[str], metadata: dict | None = None):
+        # ===== FILE SETUP =====
+        self.filepath = filepath
+        self.car_ids = list(car_ids)
+        self.car_index = {car_id: index for index, car_id in enumerate(self.car_ids)}
+        self.metadata = dict(metadata or {})
+        self.rows = 0
+        self.closed = False
+        self.file = open(filepath, "wb")
+        self.file.write(npy_header(0))
+
+    # ===== WRITING =====
+    def append(self, car_id: str, record: LapRecord) -> None:
+        # Rows go straight to the buffered file, so memory stays flat however long the race runs.
+        if self.closed:
+            return
+
+        self.file.write(LAP_RECORD.pack(
+            self.car_index[car_id],
+            int(record.lap),
+            float(record.lap_time),
+            float(record.total_time),
+            encode_text("compound", record.compound),
+            encode_text("weekend_role", record.weekend_role),
+            float(record.tyre_age),
+            int(record.stint_id),
+        ))
+        self.rows += 1
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        self.closed = True
+        self.file.seek(0)
+        self.file.write(npy_header(self.rows))
+        self.file.close()
+
+        # Car names and race metadata sit next to the array, since .npy only holds the rows.
+        with open(sidecar_path(self.filepath), "w", encoding="utf-8") as file:
+            json.dump({"car_ids": self.car_ids, "rows": self.rows, **self.metadata}, file, indent=2)
+
+
+# ===== READING =====
+def load_lap_store(filepath: str, mmap: bool = True):
+    # Returns (records, metadata); the records are a structured array mapped from disk.
+    import numpy as np
+
+    records = np.load(filepath, mmap_mode="r" if mmap else None)
+
+    with open(sidecar_path(filepath), encoding="utf-8") as file:
+        metadata = json.load(file)
+
+    return records, metadata
@@ -0,0 +1,73 @@
+from __future__ import annotations
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+from src.agents.CarAgent import CarAgent
+
+# ===== ZONE KEYS =====
+DRS_ZONE_KEYS = ("zone_number", "detection_point", "activation_start", "activation_end")
+
+class MarkerSchedule:
+    def __init__(self, track_length: float, drs_zones: List[dict], pit_entry_point: Optional[float], segment_starts: List[float], segment_ends: List[float]):
+        # ===== COMPILED DRS ZONES =====
+        self.track_length = float(track_length)
+        zones = [zone for zone in drs_zones if all(key in zone for key in DRS_ZONE_KEYS)]
+        # (zone number, detection point, activation start, activation end), converted once here.
+        self.zones: List[Tuple[int, float, float, float]] = [
+            (int(zone["zone_number"]), float(zone["detection_point"]), float(zone["activation_start"]), float(zone["activation_end"]))
+            for zone in zones
+        ]
+        self.detections: List[Tuple[int, float]] = [(znum, detect) for znum, detect, _, _ in self.zones]
+        # ===== ACTIVATION WINDOWS PER SEGMENT =====
+        self.windows_by_segment = [self.windows_touching(start, end) for start, end in zip(segment_starts, segment_ends)]
+        # ===== MARKER TABLE =====
+        # Every position where a crossing triggers per-car work: DRS detection and pit entry.
+        markers = {detect % self.track_length for _, detect in self.detections}
+        if pit_entry_point is not None:
+            markers.add(float(pit_entry_point) % self.track_length)
+        self.markers = sorted(markers)
+
+    def windows_touching(self, start: float, end: float) -> List[Tuple[int, float, float]]:
+        # Activation windows that can contain a position of this segment, so a car only tests those.
+        windows = []
+
+        for znum, _, a0, a1 in self.zones:
+            if a1 >= a0:
+                touches = a0 <= end and a1 >= start
+            else:
+                touches = end >= a0 or start <= a1
+
+            if touches:
+                windows.append((znum, a0, a1))
+
+        return windows
+
+    # ===== PER-CAR POINTER =====
+    def next_marker_after(self, position: float) -> float:
+        # First marker strictly past the position, unwrapped past the line when the lap has none left.
+        if not self.markers:
+            return float("inf")
+
+        index = bisect_right(self.markers, position)
+        if index < len(self.markers):
+            return self.markers[index]
+        return self.markers[0] + self.track_length
+
+    def crossed_marker(self, car: CarAgent) -> bool:
+        # One comparison against the car's next marker. It can only over-report (float rounding
+        # on a wrapped lap), never miss a crossing, so the exact checks behind it stay exact.
+        prev_pos = car.prev_track_position
+        curr_pos = car.track_position
+
+        if prev_pos != car.marker_anchor:
+            # The car was placed rather than driven here (grid, pit exit, battle resolution).
+            car.next_marker = self.next_marker_after(prev_pos)
+
+        wrapped = curr_pos < prev_pos
+        crossed = (curr_pos + self.track_length if wrapped else curr_pos) >= car.next_marker
+
+        if crossed or wrapped:
+            car.next_marker = self.next_marker_after(curr_pos)
+
+        car.marker_anchor = curr_pos
+        return crossed
@@ -0,0 +1,295 @@
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from src.agents.CarAgent import LapRecord
+from src.sim.ConfigRegistry import CONFIGS, install_config_snapshot
+
+# ===== POINTS SYSTEM =====
+POINTS_BY_POSITION = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+
+# ===== PER-RACE SUMMARY =====
+@dataclass
+class RaceSummary:
+    seed: int
+    finishing_order: List[str]
+    total_times: dict[str, float]
+    stop_laps: dict[str, List[int]]
+    compounds: dict[str, List[str]]
+    retired: List[str] = field(default_factory=list)
+    ticks: int = 0
+    wall_time_s: float = 0.0
+
+# ===== AGGREGATED RESULTS =====
+@dataclass
+class CarDistribution:
+    car_id: str
+    team_id: str
+    races: int = 0
+    wins: int = 0
+    podiums: int = 0
+    points_finishes: int = 0
+    dnfs: int = 0
+    total_points: float = 0.0
+    finish_positions: List[int] = field(default_factory=list)
+    finish_times: List[float] = field(default_factory=list)
+
+    @property
+    def win_probability(self) -> float:
+        return self.wins / max(1, self.races)
+
+    @property
+    def podium_probability(self) -> float:
+        return self.podiums / max(1, self.races)
+
+    @property
+    def points_probability(self) -> float:
+        return self.points_finishes / max(1, self.races)
+
+    @property
+    def expected_points(self) -> float:
+        return self.total_points / max(1, self.races)
+
+    def finish_time_stats(self) -> dict[str, float]:
+        # Summary of the finish-time distribution over races the car completed.
+        if not self.finish_times:
+            return {}
+
+        times = sorted(self.finish_times)
+        return {
+            "mean": statistics.fmean(times),
+            "std": statistics.pstdev(times) if len(times) > 1 else 0.0,
+            "min": times[0],
+            "p10": percentile(times, 0.10),
+            "p50": percentile(times, 0.50),
+            "p90": percentile(times, 0.90),
+            "max": times[-1],
+        }
+
+@dataclass
+class MonteCarloReport:
+    sim_filepath: str
+    races: int = 0
+    cars: dict[str, CarDistribution] = field(default_factory=dict)
+    summaries: List[RaceSummary] = field(default_factory=list)
+
+    def add(self, summary: RaceSummary, team_by_car: dict[str, str]) -> None:
+        # Fold one finished race into the running totals.
+        self.races += 1
+        self.summaries.append(summary)
+
+        for position, car_id in enumerate(summary.finishing_order, start=1):
+            dist = self.get_distribution(car_id, team_by_car)
+            dist.races += 1
+            dist.finish_positions.append(position)
+            dist.finish_times.append(summary.total_times[car_id])
+
+            if position == 1:
+                dist.wins += 1
+
+            if position <= 3:
+                dist.podiums += 1
+
+            if position <= len(POINTS_BY_POSITION):
+                dist.points_finishes += 1
+                dist.total_points += POINTS_BY_POSITION[position - 1]
+
+        for car_id in summary.retired:
+            dist = self.get_distribution(car_id, team_by_car)
+            dist.races += 1
+            dist.dnfs += 1
+
+    def get_distribution(self, car_id: str, team_by_car: dict[str, str]) -> CarDistribution:
+        if car_id not in self.cars:
+            self.cars[car_id] = CarDistribution(car_id=car_id, team_id=team_by_car.get(car_id, ""))
+        return self.cars[car_id]
+
+    def ranked(self) -> List[CarDistribution]:
+        return sorted(self.cars.values(), key=lambda dist: (-dist.expected_points, -dist.win_probability, dist.car_id))
+
+# ===== HELPERS =====
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    # Linear interpolation between the closest ranks.
+    if not sorted_values:
+        return 0.0
+
+    position = (len(sorted_values) - 1) * min(max(fraction, 0.0), 1.0)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1.0 - weight) + sorted_values[upper] * weight
+
+def extract_stint_history(completed_laps: Iterable[LapRecord]) -> tuple[List[int], List[str]]:
+    # Pit laps are the laps where a new stint id first appears in the lap records.
+    stop_laps: List[int] = []
+    compounds: List[str] = []
+
+    current_stint = None
+    for record in completed_laps:
+        stint_id = record.stint_id
+
+        if stint_id != current_stint:
+            if current_stint is not None:
+                stop_laps.append(int(record.lap))
+            compounds.append(record.compound)
+            current_stint = stint_id
+
+    return stop_laps, compounds
+
+# ===== WORKER =====
+def summarise_race(rm, seed: int, ticks: int, wall_time_s: float) -> tuple[RaceSummary, dict[str, str]]:
+    classified, retired = rm.build_final_classification()
+
+    stop_laps: dict[str, List[int]] = {}
+    compounds: dict[str, List[str]] = {}
+    for car in rm.cars:
+        stop_laps[car.car_id], compounds[car.car_id] = extract_stint_history(car.completed_laps)
+
+    summary = RaceSummary(
+        seed=seed,
+        finishing_order=[car.car_id for car in classified],
+        total_times={car.car_id: car.total_time for car in classified},
+        stop_laps=stop_laps,
+        compounds=compounds,
+        retired=[car.car_id for car in retired],
+        ticks=ticks,
+        wall_time_s=wall_time_s,
+    )
+
+    team_by_car = {car.car_id: car.team_id for car in rm.cars}
+    return summary, team_by_car
+
+def lap_store_filepath(lap_store_dir: str | None, seed: int) -> str | None:
+    if lap_store_dir is None:
+        return None
+
+    os.makedirs(lap_store_dir, exist_ok=True)
+    return os.path.join(lap_store_dir, f"laps-seed-{seed}.npy")
+
+def run_seeded_race(sim_filepath: str, seed: int, engine: str = "fixed", lap_store_dir: str | None = None, rng_mode: str = "shared") -> tuple[RaceSummary, dict[str, str]]:
+    # Runs inside a worker process, so the race manager is built fresh for every seed.
+    from src.RaceSimulator import main
+    from src.sim.HeadlessRunner import HeadlessRunner
+
+    # Workers only need the summary, so the race log is switched off.
+    rm = main(sim_filepath, seed=seed, log_mode="off", lap_store_path=lap_store_filepath(lap_store_dir, seed), rng_mode=rng_mode)
+    result = HeadlessRunner(rm, engine=engine).run()
+    return summarise_race(rm, seed, result.ticks, result.wall_time_s)
+
+def run_seeded_batch(sim_filepath: str, seeds: List[int], lap_store_dir: str | None = None, rng_mode: str = "shared") -> List[tuple[RaceSummary, dict[str, str]]]:
+    # Runs a chunk of seeds as one (races, cars) array simulation inside a single worker.
+    from src.RaceSimulator import main
+    from src.sim.HeadlessRunner import HeadlessRunner
+    from src.sim.VectorEngine import BatchedRaceEngine
+
+    race_managers = [main(sim_filepath, seed=seed, log_mode="off", lap_store_path=lap_store_filepath(lap_store_dir, seed), rng_mode=rng_mode) for seed in seeds]
+    for rm in race_managers:
+        HeadlessRunner(rm).start_race()
+
+    start = time.perf_counter()
+    batch = BatchedRaceEngine(race_managers)
+    batch.run()
+    wall_time = (time.perf_counter() - start) / max(1, len(seeds))
+
+    results = []
+    for k, (rm, seed) in enumerate(zip(race_managers, seeds)):
+        rm.close_outputs()
+        results.append(summarise_race(rm, seed, int(batch.race_ticks[k]), wall_time))
+
+    return results
+
+# ===== ENGINE =====
+class MonteCarloEngine:
+    def __init__(self, sim_filepath: str, n_races: int, base_seed: int = 0, max_workers: int | None = None, engine: str = "fixed", batch_size: int = 32, lap_store_dir: str | None = None, rng_mode: str = "shared"):
+        # ===== RUN SETUP =====
+        self.sim_filepath = sim_filepath
+        self.engine = engine
+        self.n_races = max(0, int(n_races))
+        self.base_seed = int(base_seed)
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.batch_size = max(1, int(batch_size))
+        self.lap_store_dir = lap_store_dir
+        self.rng_mode = rng_mode
+        self.seeds = [self.base_seed + index for index in range(self.n_races)]
+
+    def create_executor(self, workers: int) -> ProcessPoolExecutor:
+        # Configs are parsed once here and shipped to every worker as a pickle, so no worker re-reads JSON.
+        return ProcessPoolExecutor(max_workers=workers, initializer=install_config_snapshot, initargs=(CONFIGS.snapshot(),))
+
+    def iter_summaries(self) -> Iterator[tuple[RaceSummary, dict[str, str]]]:
+        # Stream race summaries back in completion order as workers finish.
+        if self.engine == "batch":
+            yield from self.iter_batch_summaries()
+            return
+
+        workers = max(1, min(self.max_workers, self.n_races))
+
+        with self.create_executor(workers) as executor:
+            futures = [executor.submit(run_seeded_race, self.sim_filepath, seed, self.engine, self.lap_store_dir, self.rng_mode) for seed in self.seeds]
+
+            for future in as_completed(futures):
+                yield future.result()
+
+    def iter_batch_summaries(self) -> Iterator[tuple[RaceSummary, dict[str, str]]]:
+        # Each worker steps a whole chunk of races at once, so per-race process overhead is paid per chunk.
+        chunks = [self.seeds[index:index + self.batch_size] for index in range(0, self.n_races, self.batch_size)]
+        workers = max(1, min(self.max_workers, len(chunks)))
+
+        with self.create_executor(workers) as executor:
+            futures = [executor.submit(run_seeded_batch, self.sim_filepath, chunk, self.lap_store_dir, self.rng_mode) for chunk in chunks]
+
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def run(self, on_summary: Optional[Callable[[RaceSummary], None]] = None) -> MonteCarloReport:
+        report = MonteCarloReport(sim_filepath=self.sim_filepath)
+
+        for summary, team_by_car in self.iter_summaries():
+            report.add(summary, team_by_car)
+
+            if on_summary is not None:
+                on_summary(summary)
+
+        report.summaries.sort(key=lambda item: item.seed)
+        return report
+
+# ===== OUTPUT =====
+def print_report(report: MonteCarloReport) -> None:
+    print(f"Monte Carlo: {report.races} races from {report.sim_filepath}\n")
+    print(f"{'Car':<5} | {'Team':<18} | {'Win':>6} | {'Podium':>6} | {'Points':>6} | {'xPts':>6} | {'DNF':>4} | {'Median time':>12}")
+
+    for dist in report.ranked():
+        stats = dist.finish_time_stats()
+        median = f"{stats['p50']:.3f}" if stats else "-"
+
+        print(
+            f"{dist.car_id:<5} | "
+            f"{dist.team_id:<18} | "
+            f"{dist.win_probability:>6.1%} | "
+            f"{dist.podium_probability:>6.1%} | "
+            f"{dist.points_probability:>6.1%} | "
+            f"{dist.expected_points:>6.2f} | "
+            f"{dist.dnfs:>4} | "
+            f"{median:>12}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run N seeded races of one config in parallel.")
+    parser.add_argument("config", help="Path to a saved RaceConfig JSON file")
+    parser.add_argument("--races", type=int, default=100, help="Number of seeded races to run")
+    parser.add_argument("--base-seed", type=int, default=0, help="Seed of the first race; later races count up from here")
+    parser.add_argument("--engine", choices=("fixed", "adaptive", "vector", "batch"), default="fixed", help="Tick engine used by every race; batch steps many races in one array pass")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to the CPU count)")
+    parser.add_argument("--lap-store-dir", default=None, help="Optional folder for one memory-mappable .npy lap store per seed")
+    parser.add_argument("--rng", choices=("shared", "streams"), default="shared", help="Shared generator per race or counter-based streams per car")
+    parser.add_argument("--batch-size", type=int, default=32, help="Races per worker array pass with --engine batch")
+    args = parser.parse_args()
+
+    engine = MonteCarloEngine(args.config, n_races=args.races, base_seed=args.base_seed, max_workers=args.workers, engine=args.engine, batch_size=args.batch_size, lap_store_dir=args.lap_store_dir, rng_mode=args.rng)
+    print_report(engine.run(on_summary=lambda summary: print(f"seed {summary.seed} done: winner {summary.finishing_order[0] if summary.finishing_order else '-'}")))
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import List
+
+# ===== LOG MODES =====
+# buffered: lines are held in memory and written on lap boundaries or once the buffer fills
+# async: the same buffering, with the file writes handed to a background thread
+# off: nothing is written, for batch and Monte Carlo runs
+LOG_MODES = ("buffered", "async", "off")
+
+LOG_FOLDER = "data/RaceData/LoggedData"
+FLUSH_LINE_LIMIT = 512
+
+class RaceLogWriter:
+    def __init__(self, filepath: str, flush_line_limit: int = FLUSH_LINE_LIMIT, background: bool = False):
+        # ===== FILE SETUP =====
+        self.filepath = filepath
+        self.flush_line_limit = max(1, int(flush_line_limit))
+        self.file = open(filepath, "w", encoding="utf-8")
+        self.pending: List[str] = []
+        self.closed = False
+        # ===== BACKGROUND WRITER =====
+        self.queue: queue.Queue | None = None
+        self.thread: threading.Thread | None = None
+        if background:
+            self.queue = queue.Queue()
+            self.thread = threading.Thread(target=self.writer_loop, name="RaceLogWriter", daemon=True)
+            self.thread.start()
+
+    # ===== WRITING =====
+    def write(self, text: str) -> None:
+        if self.closed:
+            return
+
+        self.pending.append(text)
+
+        if len(self.pending) >= self.flush_line_limit:
+            self.flush()
+
+    def flush(self) -> None:
+        # Hand the buffered lines to the file as one block.
+        if self.closed or not self.pending:
+            return
+
+        block = "\n".join(self.pending) + "\n"
+        self.pending = []
+
+        if self.queue is not None:
+            self.queue.put(block)
+        else:
+            self.file.write(block)
+            self.file.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        self.flush()
+        self.closed = True
+
+        if self.queue is not None:
+            # None tells the writer thread to drain what is left and stop.
+            self.queue.put(None)
+            self.thread.join()
+
+        self.file.close()
+
+    # ===== BACKGROUND WRITER =====
+    def writer_loop(self) -> None:
+        while True:
+            block = self.queue.get()
+            if block is None:
+                return
+
+            self.file.write(block)
+            self.file.flush()
+
+
+class NullRaceLog:
+    # Stands in for the writer when logging is off, so callers never branch on the mode.
+    def __init__(self):
+        self.filepath = None
+
+    def write(self, text: str) -> None:
+        return
+
+    def flush(self) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+
+# ===== FACTORY =====
+def new_log_filepath(folder_path: str = LOG_FOLDER) -> str:
+    os.makedirs(folder_path, exist_ok=True)
+
+    timestamp = datetime.now().strftime("%d-%m-%Y-%H-%M-%S")
+    file_name = f"RaceLog-{timestamp}.txt"
+    return os.path.join(folder_path, file_name)
+
+def open_race_log(log_mode: str = "buffered") -> RaceLogWriter | NullRaceLog:
+    if log_mode not in LOG_MODES:
+        raise ValueError(f"Unknown log mode '{log_mode}', expected one of {LOG_MODES}")
+
+    if log_mode == "off":
+        return NullRaceLog()
+
+    return RaceLogWriter(new_log_filepath(), background=(log_mode == "async"))
@@ -1,20 +1,26 @@
 from __future__ import annotations
-import json
-import os
 import random
-from datetime import datetime
+from bisect import bisect_right, insort
 from typing import List
 
 from src.sim.RaceState import RaceState, CarSnapshot
 from src.agents.TeamAgent import TeamAgent
-from src.agents.CarAgent import CarAgent, CarCalibration
-from src.models.TyreModel import TyreModel, TyreState
+from src.agents.CarAgent import CarAgent, CarCalibration, LapRecord
+from src.models.TyreModel import TyreState
+from src.sim.RaceLog import open_race_log
+from src.sim.LapStore import LapStoreWriter
+from src.sim.RunningOrder import RunningOrder
+from src.sim.RngStreams import build_car_streams
+from src.sim.ConfigRegistry import CONFIGS
+from src.sim.RaceSnapshot import RaceSnapshot
+from src.agents.StrategyPlanner import PLANNER_MODES, RolloutPlanner
 
 class RaceManager:
-    def __init__(self, season: str, grandprix: str, circuit: str, total_laps: int, base_lap_time: float, lap_time_std: float, pit_loss: float, pit_speed: float, starting_grid: list | None = None, circuit_characteristics: dict | None = None, seed: int | None = None, config_filepath: str | None = None):
+    def __init__(self, season: str, grandprix: str, circuit: str, total_laps: int, base_lap_time: float, lap_time_std: float, pit_loss: float, pit_speed: float, starting_grid: list | None = None, circuit_characteristics: dict | None = None, seed: int | None = None, config_filepath: str | None = None, log_mode: str = "buffered", lap_store_path: str | None = None, rng_mode: str = "shared", planner_mode: str = "heuristic"):
         # ===== CORE RACE SETUP =====
         self.seed = 0 if seed is None else int(seed)
         self.rng = random.Random(self.seed)
+        self.rng_mode = rng_mode
         self.season = season
         self.grandprix = grandprix
         self.circuit_name = circuit
@@ -37,62 +43,58 @@ class RaceManager:
         self.cars_pitting_this_lap: int = 0
         self.race_state = RaceState()
         self.last_logged_completed_lap = 0
+        # Lap number -> (car, lap record) rows kept sorted by total time as cars cross the line.
+        self.lap_classifications: dict[int, List[tuple[CarAgent, LapRecord]]] = {}
         # ===== TYRE COMPOUND MAP =====
-        with open("configs/tyre_compounds.json") as f:
-            compound_data = json.load(f)
-        self.compound_map = compound_data["season"][self.season][self.grandprix]["compounds"]
+        self.compound_map = CONFIGS.compound_map(self.season, self.grandprix)
         # ===== CIRCUIT DATA =====
-        with open("configs/circuits.json") as f:
-            circuits_data = json.load(f)
-        circuit_data = circuits_data[self.grandprix]
-        self.track_length = float(circuit_data["track_model"]["track_length"])
-        self.raw_segments = circuit_data["track_model"]["segments"]
-        self.drs_zones = circuit_data.get("drs_zones", [])
+        # Segments, DRS zones, pit geometry and multipliers come pre-compiled and shared across races.
+        circuit_model = CONFIGS.compiled_circuit(self.grandprix, circuit_characteristics)
+        self.circuit_model = circuit_model
+        self.track_length = circuit_model.track_length
+        self.raw_segments = circuit_model.raw_segments
+        self.drs_zones = circuit_model.drs_zones
         # ===== CIRCUIT CHARACTERISTICS =====
-        self.characteristics = circuit_data.get("characteristics", {}).copy()
-        if circuit_characteristics is not None:
-            for name, value in circuit_characteristics.items():
-                if value != "Default":
-                    self.characteristics[name] = value
-        abrasion = float(self.characteristics.get("asphalt_abrasion", 3))
-        tyre_stress = float(self.characteristics.get("tyre_stress", 3))
-        self.track_deg_multiplier = 1.0 + 0.03 * (abrasion - 3.0) + 0.03 * (tyre_stress - 3.0)
-        self.track_deg_multiplier = min(max(self.track_deg_multiplier, 0.80), 1.25)
+        self.characteristics = circuit_model.characteristics
+        self.track_deg_multiplier = circuit_model.track_deg_multiplier
+        self.overtake_difficulty = circuit_model.overtake_difficulty
         # ===== PIT LANE MODEL =====
-        pit_cfg = circuit_data.get("pit_lane", {}) or {}
-        self.pit_enabled = bool(pit_cfg.get("enabled", False))
-        self.pit_entry_point = float(pit_cfg.get("pit_entry_point", 0.0))
-        self.pit_exit_point = float(pit_cfg.get("pit_exit_point", 0.0))
-        self.pit_lane_distance = float(pit_cfg.get("pit_lane_distance", 0.0))
-        self.pit_speed = float(pit_cfg.get("pit_speed_limit_mps", self.pit_speed))
-        self.pit_service_time_mean = float(pit_cfg.get("service_time_mean", 2.5))
-        self.pit_service_time_std = float(pit_cfg.get("service_time_std", 0.3))
-        self.pit_box_position_m = float(pit_cfg.get("pit_box_position_m", self.pit_lane_distance * 0.45))
+        self.pit_enabled = circuit_model.pit_enabled
+        self.pit_entry_point = circuit_model.pit_entry_point
+        self.pit_exit_point = circuit_model.pit_exit_point
+        self.pit_lane_distance = circuit_model.pit_lane_distance
+        if circuit_model.pit_speed_limit is not None:
+            self.pit_speed = circuit_model.pit_speed_limit
+        self.pit_service_time_mean = circuit_model.pit_service_time_mean
+        self.pit_service_time_std = circuit_model.pit_service_time_std
+        self.pit_box_position_m = circuit_model.pit_box_position_m
         self.team_box_busy: dict[str, CarAgent] = {}
-        crosses_finish = self.pit_entry_point > self.pit_exit_point
-        if crosses_finish:
-            self.pit_line_position_m = self.track_length - self.pit_entry_point
-            if self.pit_line_position_m > self.pit_lane_distance:
-                self.pit_line_position_m = None
-        else:
-            self.pit_line_position_m = None
+        self.pit_line_position_m = circuit_model.pit_line_position_m
         # ===== TRACK MODEL HELPERS =====
-        self.segment_boundaries = self.build_segment_boundaries()
-        self.normalise_drs_zones()
+        self.segment_boundaries = circuit_model.segment_boundaries
+        self.segment_starts = circuit_model.segment_starts
+        self.segment_ends = circuit_model.segment_ends
+        self.segment_data = circuit_model.segment_data
+        self.segment_types = circuit_model.segment_types
+        self.segment_severities = circuit_model.segment_severities
+        self.segment_lengths = circuit_model.segment_lengths
+        self.marker_schedule = circuit_model.marker_schedule
         # ===== GRID + LOGGING =====
         self.teams, self.cars = self.build_grid()
-        self.log_filepath = self.create_log_file()
+        self.running_order = RunningOrder(self.cars, self.get_progress)
+        self.planner_mode = planner_mode
+        self.attach_strategy_planner()
+        self.race_log = open_race_log(log_mode)
+        self.log_filepath = self.race_log.filepath
         self.write_log_header()
+        self.race_log.flush()
+        # ===== LAP STORE =====
+        self.lap_store = self.open_lap_store(lap_store_path) if lap_store_path is not None else None
 
     # ===== GRID BUILD =====
     def build_grid(self) -> tuple[List[TeamAgent], List[CarAgent]]:
-        with open("configs/teams.json") as f:
-            teams_json = json.load(f)[self.season]
-
-        with open("configs/tyres.json") as f:
-            tyres_json = json.load(f)
-
-        self.tyre_model = TyreModel(tyres_json)
+        teams_json = CONFIGS.season_teams(self.season)
+        self.tyre_model = CONFIGS.tyre_model()
 
         teams: List[TeamAgent] = []
         cars: List[CarAgent] = []
@@ -125,6 +127,7 @@ class RaceManager:
                     tyre_state = tyre_state,
                     tyre_model = self.tyre_model,
                     rng = self.rng,
+                    streams = build_car_streams(self.rng_mode, self.seed, driver["name"], self.rng),
                 )
 
                 car.set_tyre_inventory({"SOFT": 1, "MEDIUM": 2, "HARD": 2,})
@@ -178,6 +181,15 @@ class RaceManager:
 
         return teams, cars
 
+    def attach_strategy_planner(self) -> None:
+        # Rollout mode gives every team one shared planner; heuristic mode leaves them on their own scoring.
+        if self.planner_mode not in PLANNER_MODES:
+            raise ValueError(f"Unknown planner mode '{self.planner_mode}', expected one of {PLANNER_MODES}")
+
+        planner = RolloutPlanner(self) if self.planner_mode == "rollout" else None
+        for team in self.teams:
+            team.planner = planner
+
     # ===== BASIC HELPERS =====
     def is_drs_enabled(self) -> bool:
         return (self.lap_number >= 2) and (self.track_state == "GREEN") and (self.weather_state == "DRY")
@@ -222,34 +234,31 @@ class RaceManager:
         return total_time
 
     # ===== SEGMENT BOUNDARIES =====
-    def build_segment_boundaries(self) -> list[dict]:
-        # Turn the raw segment list into start / end ranges so position lookups are simple.
-        boundaries = []
-        current_start = 0.0
+    def get_segment_index_for_position(self, position: float) -> int:
+        index = bisect_right(self.segment_starts, position) - 1
 
-        for seg in self.raw_segments:
-            start = current_start
-            end = start + float(seg["length"])
+        if index < 0 or position >= self.segment_ends[index]:
+            return len(self.segment_starts) - 1
 
-            boundaries.append({
-                "start": start,
-                "end": end,
-                "data": seg,
-            })
+        return index
 
-            current_start = end
+    def get_segment_index_for_car(self, car: CarAgent) -> int:
+        # Cars only move forward, so the cursor either stays put or steps to the next segment.
+        index = car.segment_cursor
+        position = car.track_position
 
-        if abs(current_start - self.track_length) > 0.01:
-            raise ValueError(f"Segment lengths ({current_start}) do not match track_length ({self.track_length})")
+        if self.segment_starts[index] <= position < self.segment_ends[index]:
+            return index
 
-        return boundaries
+        index = index + 1 if index + 1 < len(self.segment_starts) else 0
+        if not (self.segment_starts[index] <= position < self.segment_ends[index]):
+            index = self.get_segment_index_for_position(position)
 
-    def get_segment_for_position(self, position: float) -> dict:
-        for seg in self.segment_boundaries:
-            if seg["start"] <= position < seg["end"]:
-                return seg["data"]
+        car.segment_cursor = index
+        return index
 
-        return self.segment_boundaries[-1]["data"]
+    def get_segment_for_position(self, position: float) -> dict:
+        return self.segment_data[self.get_segment_index_for_position(position)]
 
     def get_progress(self, car: CarAgent) -> float:
         # Convert both track running and pit-lane running into one comparable progress value.
@@ -318,13 +327,19 @@ class RaceManager:
 
     def handle_on_track_tick(self, car: CarAgent, dt: float, drs_enabled: bool) -> None:
         # Run one normal on-track movement step for the car.
-        segment = self.get_segment_for_position(car.track_position)
-        seg_type = segment.get("type", "straight")
+        segment_index = self.get_segment_index_for_car(car)
+        segment = self.segment_data[segment_index]
+        seg_type = self.segment_types[segment_index]
 
-        car.update_drs_active(drs_enabled=drs_enabled, segment_type=seg_type, track_position=car.track_position, drs_zones=self.drs_zones, in_window_fn=self.is_pos_in_circular_window)
+        car.update_drs_active(drs_enabled=drs_enabled, segment_type=seg_type, track_position=car.track_position, drs_windows=self.marker_schedule.windows_by_segment[segment_index], in_window_fn=self.is_pos_in_circular_window)
         self.maybe_trigger_overtake(car, segment)
 
-        speed = car.compute_speed(
+        speed = self.compute_car_speed(car, segment)
+        self.advance_car_on_track(car, speed, dt, drs_enabled)
+
+    def compute_car_speed(self, car: CarAgent, segment: dict, noise_scale: float = 1.0) -> float:
+        # Shared speed call so every engine feeds the car the same race context.
+        return car.compute_speed(
             segment=segment,
             track_length=self.track_length,
             base_lap_time=self.base_lap_time,
@@ -334,24 +349,30 @@ class RaceManager:
             drs_available=car.drs_active,
             total_laps=self.total_laps,
             track_state=self.track_state,
+            noise_scale=noise_scale,
         )
+
+    def advance_car_on_track(self, car: CarAgent, speed: float, dt: float, drs_enabled: bool) -> None:
+        # Move the car at a fixed speed for dt and handle markers, pit entry and the line.
         car.last_speed_mps = speed
 
         distance = speed * dt
         crossed_line, crossing_ratio = car.advance_position(distance, self.track_length)
 
-        car.update_drs_eligibility(
-            drs_enabled=drs_enabled,
-            has_car_ahead=(car.car_ahead is not None),
-            gap_ahead_m=car.gap_ahead,
-            last_speed_mps=car.last_speed_mps,
-            drs_zones=self.drs_zones,
-            did_cross_marker_fn=self.did_cross_marker,
-            prev_pos=car.prev_track_position,
-            curr_pos=car.track_position,
-        )
+        # Detection points and pit entry only matter on the tick a car passes one.
+        if self.marker_schedule.crossed_marker(car):
+            car.update_drs_eligibility(
+                drs_enabled=drs_enabled,
+                has_car_ahead=(car.car_ahead is not None),
+                gap_ahead_m=car.gap_ahead,
+                last_speed_mps=car.last_speed_mps,
+                drs_detections=self.marker_schedule.detections,
+                did_cross_marker_fn=self.did_cross_marker,
+                prev_pos=car.prev_track_position,
+                curr_pos=car.track_position,
+            )
 
-        self.maybe_enter_pit_lane(car)
+            self.maybe_enter_pit_lane(car)
 
         if crossed_line and not car.in_pit_lane:
             crossing_dt = dt * crossing_ratio
@@ -388,15 +409,20 @@ class RaceManager:
         if apply_tyre_wear:
             car.update_tyre_wear(self.track_deg_multiplier)
 
-        car.completed_laps.append({
-            "lap": completed_lap_number,
-            "lap_time": lap_time,
-            "total_time": car.total_time,
-            "compound": car.tyre_state.compound,
-            "tyre_age": car.tyre_state.age_laps,
-            "weekend_role": car.tyre_state.weekend_role,
-            "stint_id": car.current_stint_id,
-        })
+        lap_record = LapRecord(
+            lap=completed_lap_number,
+            lap_time=lap_time,
+            total_time=car.total_time,
+            compound=car.tyre_state.compound,
+            tyre_age=car.tyre_state.age_laps,
+            weekend_role=car.tyre_state.weekend_role,
+            stint_id=car.current_stint_id,
+        )
+        car.completed_laps.append(lap_record)
+        insort(self.lap_classifications.setdefault(completed_lap_number, []), (car, lap_record), key=lambda row: row[1].total_time)
+
+        if self.lap_store is not None:
+            self.lap_store.append(car.car_id, lap_record)
 
         if car.lap_count >= self.total_laps and self.winner_finish_time is None:
             self.winner_finish_time = car.total_time
@@ -529,29 +555,38 @@ class RaceManager:
         for team in self.teams:
             team.decide()
 
-    def get_lap_record(self, car: CarAgent, lap_number: int):
-        for record in car.completed_laps:
-            if record["lap"] == lap_number:
-                return record
-        return None
-
-    # ===== OUTPUT / LOGS =====
-    def create_log_file(self) -> str:
-        folder_path = "data/RaceData/LoggedData"
-        os.makedirs(folder_path, exist_ok=True)
-
-        timestamp = datetime.now().strftime("%d-%m-%Y-%H-%M-%S")
-        file_name = f"RaceLog-{timestamp}.txt"
-        file_path = os.path.join(folder_path, file_name)
+    def get_lap_record(self, car: CarAgent, lap_number: int) -> LapRecord | None:
+        return car.completed_laps.by_lap(lap_number)
 
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write("")
-
-        return file_path
+    def get_lap_classification(self, lap_number: int) -> List[tuple[CarAgent, LapRecord]]:
+        # Every car that has completed this lap, ordered by race time at the line.
+        return self.lap_classifications.get(lap_number, [])
 
+    # ===== OUTPUT / LOGS =====
     def write_to_log(self, text: str) -> None:
-        with open(self.log_filepath, "a", encoding="utf-8") as file:
-            file.write(text + "\n")
+        self.race_log.write(text)
+
+    def open_lap_store(self, filepath: str) -> LapStoreWriter:
+        metadata = {
+            "grandprix": self.grandprix,
+            "season": self.season,
+            "seed": self.seed,
+            "total_laps": self.total_laps,
+            "config_filepath": self.config_filepath,
+        }
+        return LapStoreWriter(filepath, [car.car_id for car in self.cars], metadata)
+
+    def close_outputs(self) -> None:
+        # Write out anything still buffered and release the log and lap store files.
+        self.race_log.close()
+
+        if self.lap_store is not None:
+            self.lap_store.close()
+
+    # ===== SNAPSHOTS =====
+    def snapshot(self) -> RaceSnapshot:
+        # Freeze the race as it stands; snapshot.fork() then gives independent continuations.
+        return RaceSnapshot.capture(self)
 
     def write_log_header(self) -> None:
         self.write_to_log("F1 SIMULATION LOG:\n\n")
@@ -575,11 +610,16 @@ class RaceManager:
 
         self.write_to_log("\n\nRACE EVENTS\n\n")
 
+    def build_final_classification(self) -> tuple[List[CarAgent], List[CarAgent]]:
+        # Classified cars ordered by race time, followed by retirements in grid order.
+        classified = sorted([car for car in self.cars if not car.retired], key=lambda car: car.total_time)
+        retired = [car for car in self.cars if car.retired]
+        return classified, retired
+
     def log_final_classification(self) -> None:
         self.write_to_log("\n\nFINAL CLASSIFICATION\n\n")
 
-        classified = sorted([car for car in self.cars if not car.retired], key=lambda car: car.total_time)
-        retired = [car for car in self.cars if car.retired]
+        classified, retired = self.build_final_classification()
 
         if not classified:
             for position, car in enumerate(retired, start=1):
@@ -632,35 +672,20 @@ class RaceManager:
             lap_to_log = self.last_logged_completed_lap + 1
             self.log_lap_summary(lap_to_log)
             self.last_logged_completed_lap = lap_to_log
+            # Lap boundaries are the natural flush points, so a live log trails by at most a lap.
+            self.race_log.flush()
 
     def log_lap_summary(self, lap_number: int) -> None:
         self.write_to_log(f"--- LAP {lap_number} COMPLETE ---")
 
-        lap_rows = []
-
-        for car in self.cars:
-            lap_record = self.get_lap_record(car, lap_number)
-            if lap_record is not None:
-                lap_rows.append({
-                    "car": car,
-                    "lap_time": lap_record["lap_time"],
-                    "total_time": lap_record["total_time"],
-                    "compound": lap_record["compound"],
-                    "tyre_age": lap_record["tyre_age"],
-                })
-
-        lap_rows.sort(key=lambda item: item["total_time"])
-
-        for position, row in enumerate(lap_rows, start=1):
-            car = row["car"]
-
+        for position, (car, lap_record) in enumerate(self.get_lap_classification(lap_number), start=1):
             self.write_to_log(
                 f"P{position:02d} | "
                 f"{car.car_id:<5} | "
-                f"Lap Time: {self.format_time(row['lap_time'])} | "
-                f"Total: {self.format_time(row['total_time'])} | "
-                f"Tyre: {row['compound']} | "
-                f"Age: {row['tyre_age']:.2f}"
+                f"Lap Time: {self.format_time(lap_record.lap_time)} | "
+                f"Total: {self.format_time(lap_record.total_time)} | "
+                f"Tyre: {lap_record.compound} | "
+                f"Age: {lap_record.tyre_age:.2f}"
             )
 
         self.write_to_log("")
@@ -669,7 +694,7 @@ class RaceManager:
     def apply_pit_stop(self, car: CarAgent) -> None:
         # Move the car into the pit lane and record the stop start.
         self.cars_pitting_this_lap += 1
-        service_time = max(0.0, self.rng.gauss(self.pit_service_time_mean, self.pit_service_time_std))
+        service_time = max(0.0, car.streams.pit_service.gauss(self.pit_service_time_mean, self.pit_service_time_std))
 
         car.start_pit_stop(
             pit_lane_total_m=self.pit_lane_distance,
@@ -691,33 +716,51 @@ class RaceManager:
         car.pending_pit = False
 
     # ===== TRAFFIC LOGIC =====
-    def apply_spatial_dirty_air(self) -> None:
+    def apply_spatial_dirty_air(self) -> List[CarAgent]:
         # Update who is near who so slipstream, dirty air, and pressure all make sense.
-        active_cars = [car for car in self.cars if not car.retired and not car.in_pit_lane]
-        active_cars.sort(key=lambda car: self.get_progress(car), reverse=True)
+        active_cars = self.running_order.refresh()
 
-        for car in active_cars:
-            car.traffic_penalty = 0.0
-            car.slipstream_bonus = 0.0
-            car.following_intensity = 0.0
-            car.car_ahead = None
-            car.car_behind = None
-            car.gap_ahead = float("inf")
-            car.gap_behind = float("inf")
-
-        for index, car in enumerate(active_cars):
-            car_ahead = active_cars[index - 1] if index > 0 else None
-            car_behind = active_cars[index + 1] if index < len(active_cars) - 1 else None
-            car_progress = self.get_progress(car)
+        self.apply_traffic_relations(active_cars, progress=self.running_order.progress)
+        return list(active_cars)
+
+    def clear_traffic_state(self, car: CarAgent) -> None:
+        car.traffic_penalty = 0.0
+        car.slipstream_bonus = 0.0
+        car.following_intensity = 0.0
+        car.car_ahead = None
+        car.car_behind = None
+        car.gap_ahead = float("inf")
+        car.gap_behind = float("inf")
+
+    def apply_traffic_relations(self, ordered_cars: List[CarAgent], outer_ahead: tuple | None = None, outer_behind: tuple | None = None, progress: List[float] | None = None) -> None:
+        # Link neighbours in an already ordered run of cars and set the traffic effects.
+        # outer_ahead / outer_behind are (car, gap) links from the run to cars outside it.
+        # progress, when given, holds get_progress for each car of the run, already measured.
+        if progress is None:
+            progress = [self.get_progress(car) for car in ordered_cars]
+
+        for car in ordered_cars:
+            self.clear_traffic_state(car)
+
+        if ordered_cars and outer_ahead is not None:
+            ordered_cars[0].car_ahead, ordered_cars[0].gap_ahead = outer_ahead
+
+        if ordered_cars and outer_behind is not None:
+            ordered_cars[-1].car_behind, ordered_cars[-1].gap_behind = outer_behind
+
+        for index, car in enumerate(ordered_cars):
+            car_ahead = ordered_cars[index - 1] if index > 0 else None
+            car_behind = ordered_cars[index + 1] if index < len(ordered_cars) - 1 else None
+            car_progress = progress[index]
 
             if car_ahead is not None:
-                ahead_progress = self.get_progress(car_ahead)
+                ahead_progress = progress[index - 1]
                 gap = ahead_progress - car_progress
                 car.car_ahead = car_ahead
                 car.gap_ahead = max(0.0, gap)
 
             if car_behind is not None:
-                behind_progress = self.get_progress(car_behind)
+                behind_progress = progress[index + 1]
                 gap_behind = car_progress - behind_progress
                 car.car_behind = car_behind
                 car.gap_behind = max(0.0, gap_behind)
@@ -742,11 +785,11 @@ class RaceManager:
         attacker.side_by_side_ticks = 5
         defender.side_by_side_ticks = 5
 
-    def resolve_side_by_side_battles(self) -> None:
+    def resolve_side_by_side_battles(self, cars: List[CarAgent] | None = None) -> None:
         # Resolve ongoing side-by-side fights and decide who comes out ahead.
         processed_pairs = set()
 
-        for car in self.cars:
+        for car in (self.cars if cars is None else cars):
             if car.side_by_side_with is None:
                 continue
 
@@ -764,34 +807,13 @@ class RaceManager:
             if car.side_by_side_ticks > 0:
                 continue
 
-            segment = self.get_segment_for_position(car.track_position)
+            segment = self.segment_data[self.get_segment_index_for_car(car)]
 
-            speed_car = car.compute_speed(
-                segment=segment,
-                track_length=self.track_length,
-                base_lap_time=self.base_lap_time,
-                lap_time_std=self.lap_time_std,
-                evolution_level=self.evolution_level,
-                track_deg_multiplier=self.track_deg_multiplier,
-                drs_available=car.drs_active,
-                total_laps=self.total_laps,
-                track_state=self.track_state,
-            )
-            
-            speed_opponent = opponent.compute_speed(
-                segment=segment,
-                track_length=self.track_length,
-                base_lap_time=self.base_lap_time,
-                lap_time_std=self.lap_time_std,
-                evolution_level=self.evolution_level,
-                track_deg_multiplier=self.track_deg_multiplier,
-                drs_available=opponent.drs_active,
-                total_laps=self.total_laps,
-                track_state=self.track_state,
-            )
+            speed_car = self.compute_car_speed(car, segment)
+            speed_opponent = self.compute_car_speed(opponent, segment)
 
-            speed_car += self.rng.gauss(0.0, 0.20)
-            speed_opponent += self.rng.gauss(0.0, 0.20)
+            speed_car += car.streams.battle.gauss(0.0, 0.20)
+            speed_opponent += opponent.streams.battle.gauss(0.0, 0.20)
 
             winner, loser = (car, opponent) if speed_car > speed_opponent else (opponent, car)
 
@@ -825,67 +847,6 @@ class RaceManager:
             winner.side_by_side_ticks = 0
             loser.side_by_side_ticks = 0
 
-    # ===== DRS ZONE NORMALISATION =====
-    def normalise_drs_zones(self) -> None:
-        # Clamp DRS activation windows so they sit on straights only.
-        if not self.drs_zones:
-            return
-
-        straight_intervals: list[tuple[float, float]] = []
-        for seg in self.segment_boundaries:
-            seg_type = seg["data"].get("type", "straight")
-            if seg_type == "straight":
-                straight_intervals.append((float(seg["start"]), float(seg["end"])))
-
-        if not straight_intervals:
-            return
-
-        def overlap_len(a0: float, a1: float, b0: float, b1: float) -> float:
-            return max(0.0, min(a1, b1) - max(a0, b0))
-
-        def window_to_intervals(start: float, end: float) -> list[tuple[float, float]]:
-            if end >= start:
-                return [(start, end)]
-            return [(start, float(self.track_length)), (0.0, end)]
-
-        new_zones = []
-
-        for zone in self.drs_zones:
-            try:
-                a0 = float(zone["activation_start"])
-                a1 = float(zone["activation_end"])
-            except (KeyError, ValueError, TypeError):
-                new_zones.append(zone)
-                continue
-
-            if a0 == a1:
-                new_zones.append(zone)
-                continue
-
-            best = None
-
-            for wa0, wa1 in window_to_intervals(a0, a1):
-                for s0, s1 in straight_intervals:
-                    overlap = overlap_len(wa0, wa1, s0, s1)
-                    if overlap > 0:
-                        new_start = max(wa0, s0)
-                        new_end = min(wa1, s1)
-
-                        if best is None or overlap > best[0]:
-                            best = (overlap, new_start, new_end)
-
-            if best is None:
-                new_zones.append(zone)
-                continue
-
-            _, new_start, new_end = best
-            updated_zone = dict(zone)
-            updated_zone["activation_start"] = new_start
-            updated_zone["activation_end"] = new_end
-            new_zones.append(updated_zone)
-
-        self.drs_zones = new_zones
-
     # ===== OVERTAKING =====
     def maybe_trigger_overtake(self, car: CarAgent, segment: dict) -> None:
         # Decide if a car should start a side-by-side attack.
@@ -905,9 +866,5 @@ class RaceManager:
         if seg_type not in ("straight", "braking"):
             return
 
-        traction = float(self.characteristics.get("traction", 3))
-        downforce = float(self.characteristics.get("downforce", 3))
-        overtake_difficulty = 1.0 + 0.05 * (3.0 - min(traction, downforce))
-
-        if car.attempt_overtake(segment=segment, drs_available=car.drs_active, overtake_difficulty=overtake_difficulty):
+        if car.attempt_overtake(segment=segment, drs_available=car.drs_active, overtake_difficulty=self.overtake_difficulty):
             self.start_side_by_side(car, car.car_ahead)
\ No newline at end of file
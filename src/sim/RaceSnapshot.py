@@ -0,0 +1,103 @@
+from __future__ import annotations
+import io
+import pickle
+from typing import Any, Dict, Tuple
+
+from src.sim.ConfigRegistry import CONFIGS
+from src.sim.RaceLog import open_race_log
+
+# ===== SHARED OBJECTS =====
+# Compiled-circuit members that are containers; scalars are cheaper to pickle than to look up.
+SHARED_CONTAINERS = (dict, list, tuple)
+
+def shared_objects(season: str, grandprix: str, overrides: Tuple[Tuple[str, Any], ...]) -> Dict[tuple, Any]:
+    # Read-only objects a race points at but never changes. A snapshot stores a short token for
+    # each and a fork re-binds it to this process's copy, so the prefix shares them rather than copying.
+    circuit_model = CONFIGS.compiled_circuit(grandprix, dict(overrides))
+    shared: Dict[tuple, Any] = {
+        ("tyre_model",): CONFIGS.tyre_model(),
+        ("compound_map",): CONFIGS.compound_map(season, grandprix),
+        ("circuit",): circuit_model,
+    }
+
+    for name, value in vars(circuit_model).items():
+        if isinstance(value, SHARED_CONTAINERS) or name == "marker_schedule":
+            shared[("circuit", name)] = value
+
+    for index, segment in enumerate(circuit_model.segment_data):
+        shared[("segment", index)] = segment
+    for index, boundary in enumerate(circuit_model.segment_boundaries):
+        shared[("boundary", index)] = boundary
+    for index, zone in enumerate(circuit_model.drs_zones):
+        shared[("drs_zone", index)] = zone
+
+    return shared
+
+
+class SnapshotPickler(pickle.Pickler):
+    def __init__(self, file, shared: Dict[tuple, Any], outputs: Tuple[Any, ...]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.tokens = {id(value): token for token, value in shared.items()}
+        # The log and lap store belong to the original race; forks open their own.
+        for output in outputs:
+            if output is not None:
+                self.tokens[id(output)] = ("output",)
+
+    def persistent_id(self, obj: Any):
+        return self.tokens.get(id(obj))
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared: Dict[tuple, Any]):
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, token: tuple) -> Any:
+        if token == ("output",):
+            return None
+        return self.shared[token]
+
+
+# ===== SNAPSHOT =====
+class RaceSnapshot:
+    # The full mutable state of a race at one instant: cars, tyres, pit phases, lap history,
+    # team agent memory, team_box_busy and RNG positions, as one pickle with the static
+    # circuit and tyre data replaced by tokens.
+    def __init__(self, season: str, grandprix: str, overrides: Tuple[Tuple[str, Any], ...], sim_time: float, lap_number: int, blob: bytes):
+        self.season = season
+        self.grandprix = grandprix
+        self.overrides = overrides
+        self.sim_time = sim_time
+        self.lap_number = lap_number
+        self.blob = blob
+
+    @classmethod
+    def capture(cls, race_manager) -> "RaceSnapshot":
+        overrides = race_manager.circuit_model.overrides
+        shared = shared_objects(race_manager.season, race_manager.grandprix, overrides)
+        buffer = io.BytesIO()
+        SnapshotPickler(buffer, shared, (race_manager.race_log, race_manager.lap_store)).dump(race_manager)
+        return cls(race_manager.season, race_manager.grandprix, overrides, race_manager.sim_time, race_manager.lap_number, buffer.getvalue())
+
+    def fork(self, log_mode: str = "off"):
+        # A new, independent RaceManager continuing from the snapshot. Forks do not write a lap store,
+        # and log nothing unless asked.
+        shared = shared_objects(self.season, self.grandprix, self.overrides)
+        race_manager = SnapshotUnpickler(io.BytesIO(self.blob), shared).load()
+        race_manager.race_log = open_race_log(log_mode)
+        race_manager.log_filepath = race_manager.race_log.filepath
+        race_manager.lap_store = None
+        return race_manager
+
+    # ===== SERIALISED FORM =====
+    def to_bytes(self) -> bytes:
+        header = (self.season, self.grandprix, self.overrides, self.sim_time, self.lap_number)
+        return pickle.dumps((header, self.blob), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RaceSnapshot":
+        header, blob = pickle.loads(data)
+        return cls(*header, blob)
+
+    def __len__(self) -> int:
+        return len(self.blob)
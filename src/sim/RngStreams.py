@@ -0,0 +1,160 @@
+from __future__ import annotations
+import hashlib
+import math
+import random
+
+# ===== RNG MODES =====
+# shared: one random.Random(seed) for the whole race, in call order (replays historical seeds)
+# streams: an independent counter-based stream per car and purpose, so draw order across cars no longer matters
+RNG_MODES = ("shared", "streams")
+
+RNG_PURPOSES = ("lap_noise", "segment_noise", "overtake", "pit_service", "reliability", "battle")
+
+# ===== SPLITMIX64 =====
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+TWO_PI = 2.0 * math.pi
+INV_2_53 = 1.0 / (1 << 53)
+NOISE_BLOCK = 4096
+
+def mix64(z: int) -> int:
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+def stream_key(seed: int, car_id: str, purpose: str) -> int:
+    # Stable 64-bit key per (seed, car, purpose); the car id keeps streams fixed if the grid order changes.
+    digest = hashlib.blake2b(f"{int(seed)}:{car_id}:{purpose}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class CounterStream:
+    # Draw n of a stream is mix64(key + n * gamma): a pure function of the key and the counter, so any
+    # draw can be produced out of order or in NumPy blocks and still match the scalar sequence.
+    __slots__ = ("key", "counter")
+
+    def __init__(self, key: int, counter: int = 0):
+        self.key = int(key) & MASK64
+        self.counter = int(counter)
+
+    def next_u64(self) -> int:
+        value = mix64((self.key + (self.counter + 1) * GOLDEN_GAMMA) & MASK64)
+        self.counter += 1
+        return value
+
+    def random(self) -> float:
+        # 53-bit uniform in [0, 1).
+        return (self.next_u64() >> 11) * INV_2_53
+
+    def standard_normal(self) -> float:
+        # Box-Muller on two uniforms, cosine branch only, so normal k always uses draws 2k and 2k + 1.
+        u1 = 1.0 - self.random()
+        u2 = self.random()
+        return math.sqrt(-2.0 * math.log(u1)) * math.cos(TWO_PI * u2)
+
+    def gauss(self, mu: float = 0.0, sigma: float = 1.0) -> float:
+        return mu + sigma * self.standard_normal()
+
+    # ===== NUMPY BLOCKS =====
+    def uniform_block(self, n: int):
+        # The next n uniforms as one array, advancing the counter exactly as n random() calls would.
+        import numpy as np
+
+        counters = np.arange(self.counter + 1, self.counter + 1 + n, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            z = np.uint64(self.key) + counters * np.uint64(GOLDEN_GAMMA)
+            z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            z = z ^ (z >> np.uint64(31))
+
+        self.counter += n
+        return (z >> np.uint64(11)).astype(np.float64) * INV_2_53
+
+    def standard_normal_block(self, n: int):
+        # The next n normals from the same counters the scalar path would use. The uniforms come from
+        # NumPy, but the transform goes through math: NumPy's vector log/cos can differ from libm in
+        # the last bit, and every path has to give the same value for the same counter.
+        import numpy as np
+
+        uniforms = self.uniform_block(2 * n).tolist()
+        sqrt, log, cos = math.sqrt, math.log, math.cos
+        return np.array([sqrt(-2.0 * log(1.0 - uniforms[k])) * cos(TWO_PI * uniforms[k + 1]) for k in range(0, 2 * n, 2)])
+
+
+class NormalBuffer:
+    # Standard normals from a CounterStream, generated a block at a time and handed out by index.
+    # Normal k is the same whatever the block size, since blocks just walk the stream's counters.
+    __slots__ = ("stream", "block_size", "values", "index")
+
+    def __init__(self, stream: CounterStream, block_size: int = NOISE_BLOCK):
+        self.stream = stream
+        self.block_size = max(1, int(block_size))
+        self.values: list[float] = []
+        self.index = 0
+
+    def refill(self) -> None:
+        try:
+            self.values = self.stream.standard_normal_block(self.block_size).tolist()
+        except ImportError:
+            # Without NumPy the block is filled one draw at a time from the same counters.
+            self.values = [self.stream.standard_normal() for _ in range(self.block_size)]
+        self.index = 0
+
+    def gauss(self, mu: float = 0.0, sigma: float = 1.0) -> float:
+        if self.index >= len(self.values):
+            self.refill()
+
+        value = self.values[self.index]
+        self.index += 1
+        return mu + sigma * value
+
+    def position(self) -> CounterStream:
+        # A stream whose next normal is this buffer's next unused one.
+        unused = len(self.values) - self.index
+        return CounterStream(self.stream.key, self.stream.counter - 2 * unused)
+
+    # ===== SNAPSHOTS =====
+    def __getstate__(self):
+        # Only the stream position of the next unused normal is kept; the rest of the block is
+        # regenerated from the same counters on the next draw after a restore.
+        return (self.position(), self.block_size)
+
+    def __setstate__(self, state) -> None:
+        self.stream, self.block_size = state
+        self.values = []
+        self.index = 0
+
+
+class CarRandomStreams:
+    # Where each kind of random draw for one car comes from.
+    __slots__ = RNG_PURPOSES
+
+    def __init__(self, lap_noise, segment_noise, overtake, pit_service, reliability, battle):
+        self.lap_noise = lap_noise
+        self.segment_noise = segment_noise
+        self.overtake = overtake
+        self.pit_service = pit_service
+        self.reliability = reliability
+        self.battle = battle
+
+    @classmethod
+    def shared(cls, rng: random.Random) -> "CarRandomStreams":
+        # Every purpose reads the race's single generator, reproducing the historical draw order.
+        return cls(*(rng for _ in RNG_PURPOSES))
+
+    @classmethod
+    def counter_based(cls, seed: int, car_id: str) -> "CarRandomStreams":
+        streams = {purpose: CounterStream(stream_key(seed, car_id, purpose)) for purpose in RNG_PURPOSES}
+        # compute_speed draws two segment normals per car per tick, so that stream is pre-generated in blocks.
+        streams["segment_noise"] = NormalBuffer(streams["segment_noise"])
+        return cls(**streams)
+
+
+def build_car_streams(rng_mode: str, seed: int, car_id: str, shared_rng: random.Random) -> CarRandomStreams:
+    if rng_mode not in RNG_MODES:
+        raise ValueError(f"Unknown RNG mode '{rng_mode}', expected one of {RNG_MODES}")
+
+    if rng_mode == "shared":
+        return CarRandomStreams.shared(shared_rng)
+
+    return CarRandomStreams.counter_based(seed, car_id)
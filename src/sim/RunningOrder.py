@@ -0,0 +1,103 @@
+from __future__ import annotations
+from typing import Callable, List, Optional
+
+from src.agents.CarAgent import CarAgent
+
+class RunningOrder:
+    def __init__(self, cars: List[CarAgent], progress_fn: Callable[[CarAgent], float]):
+        # ===== FIELD =====
+        self.cars = cars
+        self.progress_fn = progress_fn
+        # Grid index breaks exact progress ties, matching a stable sort over the field order.
+        self.field_index = {id(car): index for index, car in enumerate(cars)}
+        # ===== ORDER STATE =====
+        self.order: List[CarAgent] = []
+        self.progress: List[float] = []
+        self.grid: List[int] = []
+        # Car -> slot map, rebuilt on the first query after a refresh rather than every tick.
+        self.slots: dict[int, int] | None = {}
+
+    # ===== SNAPSHOTS =====
+    def __getstate__(self):
+        # The maps are keyed by id(car), which changes when a snapshot is restored, so they are rebuilt.
+        state = self.__dict__.copy()
+        state["field_index"] = None
+        state["slots"] = None
+        return state
+
+    def __setstate__(self, state) -> None:
+        self.__dict__.update(state)
+        self.field_index = {id(car): index for index, car in enumerate(self.cars)}
+
+    # ===== MEMBERSHIP =====
+    def sync_members(self) -> None:
+        # Drop retired and pit-lane cars, and append cars that rejoined, where the sort repair picks them up.
+        running = [car for car in self.cars if not car.retired and not car.in_pit_lane]
+
+        if len(running) == len(self.order) and all(not car.retired and not car.in_pit_lane for car in self.order):
+            return
+
+        members = {id(car) for car in running}
+        order = [car for car in self.order if id(car) in members]
+        kept = {id(car) for car in order}
+        order.extend(car for car in running if id(car) not in kept)
+
+        self.order = order
+        self.grid = [self.field_index[id(car)] for car in order]
+
+    # ===== REPAIR =====
+    def refresh(self) -> List[CarAgent]:
+        # Re-measure progress and insertion-sort the previous order, which is almost always
+        # still sorted, so a tick without position changes costs one pass over the field.
+        self.sync_members()
+
+        order = self.order
+        grid = self.grid
+        progress_fn = self.progress_fn
+        progress = [progress_fn(car) for car in order]
+
+        for i in range(1, len(order)):
+            car, car_progress, car_grid = order[i], progress[i], grid[i]
+            j = i - 1
+
+            while j >= 0 and (progress[j] < car_progress or (progress[j] == car_progress and grid[j] > car_grid)):
+                order[j + 1], progress[j + 1], grid[j + 1] = order[j], progress[j], grid[j]
+                j -= 1
+
+            order[j + 1], progress[j + 1], grid[j + 1] = car, car_progress, car_grid
+
+        self.progress = progress
+        self.slots = None
+        return order
+
+    # ===== QUERIES =====
+    def slot_of(self, car: CarAgent) -> Optional[int]:
+        if self.slots is None:
+            self.slots = {id(member): slot for slot, member in enumerate(self.order)}
+        return self.slots.get(id(car))
+
+    def position_of(self, car: CarAgent) -> Optional[int]:
+        slot = self.slot_of(car)
+        return None if slot is None else slot + 1
+
+    def car_ahead(self, car: CarAgent) -> Optional[CarAgent]:
+        slot = self.slot_of(car)
+        return self.order[slot - 1] if slot else None
+
+    def car_behind(self, car: CarAgent) -> Optional[CarAgent]:
+        slot = self.slot_of(car)
+        if slot is None or slot + 1 >= len(self.order):
+            return None
+        return self.order[slot + 1]
+
+    def gap_ahead(self, car: CarAgent) -> float:
+        slot = self.slot_of(car)
+        if not slot:
+            return float("inf")
+        return max(0.0, self.progress[slot - 1] - self.progress[slot])
+
+    def gap_behind(self, car: CarAgent) -> float:
+        slot = self.slot_of(car)
+        if slot is None or slot + 1 >= len(self.order):
+            return float("inf")
+        return max(0.0, self.progress[slot] - self.progress[slot + 1])
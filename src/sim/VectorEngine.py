@@ -0,0 +1,688 @@
+from __future__ import annotations
+from typing import List
+
+import numpy as np
+
+from src.agents.CarAgent import CarAgent
+from src.sim.RaceManager import RaceManager
+from src.sim.RngStreams import NOISE_BLOCK
+
+# ===== SEGMENT TYPE CODES =====
+SEG_STRAIGHT = 0
+SEG_CORNER = 1
+SEG_BRAKING = 2
+SEGMENT_TYPE_CODES = {"straight": SEG_STRAIGHT, "corner": SEG_CORNER, "braking": SEG_BRAKING}
+
+# ===== INSTRUCTION MULTIPLIERS =====
+INSTRUCTION_MULTIPLIERS = {"PUSH": 0.997, "SAVE": 1.004}
+
+NO_STAMP = -(10 ** 9)
+
+# ===== NOISE SOURCES =====
+class RaceNoise:
+    # One NumPy generator per race, seeded from that race alone. Every draw for a car comes from its
+    # own race's generator in the order a batch of one would make it, so race k's outcome depends on
+    # its seed only, not on the other seeds in its batch or on the batch size.
+    def __init__(self, seeds: List[int], race_of: np.ndarray):
+        self.rngs = [np.random.default_rng(seed) for seed in seeds]
+        self.race_of = race_of
+
+    def race_groups(self, idx: np.ndarray):
+        # Cars of one race sit next to each other in the flat layout, so idx splits into runs.
+        races = self.race_of[idx]
+        cuts = np.flatnonzero(races[1:] != races[:-1]) + 1
+        starts = np.concatenate(([0], cuts))
+        ends = np.concatenate((cuts, [len(idx)]))
+        return [(int(races[start]), start, end) for start, end in zip(starts, ends)]
+
+    def segment_normals(self, idx: np.ndarray) -> np.ndarray:
+        # Two normals per car: segment-time noise and the small execution jitter.
+        out = np.empty((2, len(idx)))
+        for k, start, end in self.race_groups(idx):
+            out[:, start:end] = self.rngs[k].standard_normal((2, end - start))
+        return out
+
+    def lap_normals(self, idx: np.ndarray) -> np.ndarray:
+        out = np.empty(len(idx))
+        for k, start, end in self.race_groups(idx):
+            out[start:end] = self.rngs[k].standard_normal(end - start)
+        return out
+
+    def overtake_uniform(self, i: int) -> float:
+        return self.rngs[int(self.race_of[i])].random()
+
+    def battle_normals(self, pair_idx: np.ndarray) -> np.ndarray:
+        return self.rngs[int(self.race_of[pair_idx[0]])].standard_normal(len(pair_idx))
+
+
+class CarStreamNoise:
+    # --rng streams: every draw comes from the car's own counter-based streams, the same streams and
+    # counters the scalar engines read, so a car's noise depends only on its race seed and car id.
+    # Segment noise is the per-tick hot path, so it is pre-generated in standard_normal_block rows and
+    # gathered with one index per car; the once-per-lap and per-attempt draws step the stream directly.
+    def __init__(self, cars: List[CarAgent], block_size: int = NOISE_BLOCK):
+        self.lap = [car.streams.lap_noise for car in cars]
+        self.overtake = [car.streams.overtake for car in cars]
+        self.battle = [car.streams.battle for car in cars]
+        # The engine owns segment noise from here on, starting at each buffer's next unused normal.
+        self.segment = [car.streams.segment_noise.position() for car in cars]
+        self.block_size = max(2, int(block_size))
+        self.segment_values = np.empty((len(cars), self.block_size))
+        self.segment_cursor = np.full(len(cars), self.block_size, dtype=np.int64)
+
+    def refill_segment_rows(self, rows: np.ndarray) -> None:
+        # Unused normals are regenerated from their own counters, so row boundaries never show in the sequence.
+        for i in rows:
+            stream = self.segment[i]
+            stream.counter -= 2 * (self.block_size - int(self.segment_cursor[i]))
+            self.segment_values[i] = stream.standard_normal_block(self.block_size)
+            self.segment_cursor[i] = 0
+
+    def segment_normals(self, idx: np.ndarray) -> np.ndarray:
+        # Each car takes its next two normals, in the order compute_speed draws them.
+        short = idx[self.segment_cursor[idx] + 2 > self.block_size]
+        if len(short):
+            self.refill_segment_rows(short)
+
+        cursor = self.segment_cursor[idx]
+        out = np.stack((self.segment_values[idx, cursor], self.segment_values[idx, cursor + 1]))
+        self.segment_cursor[idx] = cursor + 2
+        return out
+
+    def lap_normals(self, idx: np.ndarray) -> np.ndarray:
+        return np.array([self.lap[i].standard_normal() for i in idx])
+
+    def overtake_uniform(self, i: int) -> float:
+        return self.overtake[i].random()
+
+    def battle_normals(self, pair_idx: np.ndarray) -> np.ndarray:
+        return np.array([self.battle[i].standard_normal() for i in pair_idx])
+
+
+class BatchedRaceEngine:
+    def __init__(self, race_managers: List[RaceManager], seeds: List[int] | None = None):
+        # ===== ENGINE SETUP =====
+        if not race_managers:
+            raise ValueError("BatchedRaceEngine needs at least one race")
+
+        self.rms: List[RaceManager] = list(race_managers)
+        self.n_races = len(self.rms)
+        self.n_cars = len(self.rms[0].cars)
+        self.check_compatible()
+
+        # Car arrays are laid out as (race, car) rows flattened into one axis, so
+        # car i of race k lives at k * n_cars + i.
+        self.cars: List[CarAgent] = [car for rm in self.rms for car in rm.cars]
+        self.race_of = np.repeat(np.arange(self.n_races), self.n_cars)
+        self.index_of = {id(car): index for index, car in enumerate(self.cars)}
+        self.noise = self.build_noise(seeds)
+        self.track_length = float(self.rms[0].track_length)
+        # ===== CIRCUIT ARRAYS =====
+        self.build_circuit_arrays()
+        # ===== PER-CAR RACE CONSTANTS =====
+        self.car_length = np.array([car.car_length for car in self.cars], dtype=float)
+        self.mu_team = np.array([car.calibration.mu_team for car in self.cars], dtype=float)
+        self.k_team = np.array([car.calibration.k_team for car in self.cars], dtype=float)
+        self.std_scale = np.array([max(float(rm.lap_time_std), 1e-6) for rm in self.rms])[self.race_of]
+        self.total_laps = np.array([rm.total_laps for rm in self.rms], dtype=np.int64)[self.race_of]
+        self.overtake_difficulty = np.array([self.compute_overtake_difficulty(rm) for rm in self.rms])[self.race_of]
+        self.pit_enabled = np.array([rm.pit_enabled for rm in self.rms], dtype=bool)[self.race_of]
+        self.pit_entry_point = np.array([rm.pit_entry_point for rm in self.rms])[self.race_of]
+        # ===== PER-RACE STATE =====
+        self.race_done = np.array([rm.race_finished for rm in self.rms], dtype=bool)
+        self.drs_enabled_race = np.zeros(self.n_races, dtype=bool)
+        self.green_race = np.zeros(self.n_races, dtype=bool)
+        self.race_ticks = np.zeros(self.n_races, dtype=np.int64)
+        # ===== CAR STATE ARRAYS =====
+        n = len(self.cars)
+        self.position = np.zeros(n)
+        self.prev_position = np.zeros(n)
+        self.lap_count = np.zeros(n, dtype=np.int64)
+        self.current_lap_time = np.zeros(n)
+        self.speed = np.zeros(n)
+        self.effective_lap_time = np.zeros(n)
+        self.instruction_mult = np.ones(n)
+        self.lap_noise = np.zeros(n)
+        self.last_lap_for_noise = np.full(n, -1, dtype=np.int64)
+        self.traffic_penalty = np.zeros(n)
+        self.slipstream_bonus = np.zeros(n)
+        self.following_intensity = np.zeros(n)
+        self.ahead_index = np.full(n, -1, dtype=np.int64)
+        self.behind_index = np.full(n, -1, dtype=np.int64)
+        self.gap_ahead = np.full(n, np.inf)
+        self.gap_behind = np.full(n, np.inf)
+        self.drs_active = np.zeros(n, dtype=bool)
+        self.drs_stamp = np.full((n, len(self.zone_numbers)), NO_STAMP, dtype=np.int64)
+        self.overtake_cooldown = np.zeros(n)
+        self.side_by_side_partner = np.full(n, -1, dtype=np.int64)
+        self.side_by_side_ticks = np.zeros(n, dtype=np.int64)
+        self.retired = np.zeros(n, dtype=bool)
+        self.in_pit_lane = np.zeros(n, dtype=bool)
+        self.pending_pit = np.zeros(n, dtype=bool)
+        self.has_started = np.zeros(n, dtype=bool)
+        self.pull_from_cars()
+
+        for k in range(self.n_races):
+            self.refresh_race_state(k)
+
+    # ===== CIRCUIT SETUP =====
+    def check_compatible(self) -> None:
+        # Races share one set of circuit arrays, so they must run on the same track model.
+        first = self.rms[0]
+
+        for rm in self.rms[1:]:
+            if rm.grandprix != first.grandprix or rm.track_length != first.track_length:
+                raise ValueError(f"Cannot batch {rm.grandprix} with {first.grandprix}: races must share a circuit")
+
+            if len(rm.cars) != self.n_cars:
+                raise ValueError(f"Cannot batch races with {len(rm.cars)} and {self.n_cars} cars")
+
+            if rm.rng_mode != first.rng_mode:
+                raise ValueError(f"Cannot batch '{rm.rng_mode}' and '{first.rng_mode}' RNG modes")
+
+    def build_noise(self, seeds: List[int] | None):
+        # seeds only applies to shared mode; streams are keyed by each race's own seed and car ids.
+        if self.rms[0].rng_mode == "streams":
+            return CarStreamNoise(self.cars)
+
+        seeds = [rm.seed for rm in self.rms] if seeds is None else list(seeds)
+        if len(seeds) != self.n_races:
+            raise ValueError(f"Got {len(seeds)} seeds for {self.n_races} races")
+        return RaceNoise(seeds, self.race_of)
+
+    def build_circuit_arrays(self) -> None:
+        rm = self.rms[0]
+
+        self.seg_start = np.array(rm.segment_starts)
+        self.seg_len = np.maximum(np.array(rm.segment_lengths), 1e-6)
+        self.seg_frac = self.seg_len / max(self.track_length, 1e-6)
+        self.seg_type = np.array([SEGMENT_TYPE_CODES.get(seg_type, SEG_STRAIGHT) for seg_type in rm.segment_types], dtype=np.int64)
+
+        severity = np.array(rm.segment_severities)
+
+        # Same per-type noise shape compute_speed uses, folded into one coefficient per
+        # segment. The race's lap_time_std scale is applied per car.
+        self.seg_sigma_coeff = np.where(
+            self.seg_type == SEG_BRAKING, 0.017 * (0.65 + 0.70 * severity),
+            np.where(self.seg_type == SEG_CORNER, 0.013 * (0.65 + 0.65 * severity), 0.008),
+        )
+
+        zones = rm.marker_schedule.zones
+        self.zone_numbers = [znum for znum, _, _, _ in zones]
+        self.zone_detect = np.array([detect for _, detect, _, _ in zones])
+        self.zone_start = np.array([a0 for _, _, a0, _ in zones])
+        self.zone_end = np.array([a1 for _, _, _, a1 in zones])
+
+    @staticmethod
+    def compute_overtake_difficulty(rm: RaceManager) -> float:
+        return rm.circuit_model.overtake_difficulty
+
+    def segment_index(self, positions: np.ndarray) -> np.ndarray:
+        # Segments start at 0 and positions are always wrapped into [0, track_length).
+        return np.searchsorted(self.seg_start, positions, side="right") - 1
+
+    def race_view(self, values: np.ndarray) -> np.ndarray:
+        # (race, car) view of a flat per-car array.
+        return values.reshape(self.n_races, self.n_cars)
+
+    def race_indices(self, k: int) -> range:
+        return range(k * self.n_cars, (k + 1) * self.n_cars)
+
+    # ===== SYNC =====
+    def pull_from_cars(self, indices=None, refresh_pace: bool = True) -> None:
+        # Copy CarAgent state into the arrays after scalar code has touched the cars.
+        indices = range(len(self.cars)) if indices is None else indices
+
+        for i in indices:
+            car = self.cars[i]
+            self.position[i] = car.track_position
+            self.prev_position[i] = car.prev_track_position
+            self.lap_count[i] = car.lap_count
+            self.current_lap_time[i] = car.current_lap_time
+            self.speed[i] = car.last_speed_mps
+            self.lap_noise[i] = car.lap_execution_noise
+            self.last_lap_for_noise[i] = car.last_lap_for_noise
+            self.overtake_cooldown[i] = car.overtake_cooldown
+            self.drs_active[i] = car.drs_active
+            self.retired[i] = car.retired
+            self.in_pit_lane[i] = car.in_pit_lane
+            self.pending_pit[i] = car.pending_pit
+            self.has_started[i] = car.has_taken_race_start
+            self.instruction_mult[i] = INSTRUCTION_MULTIPLIERS.get(car.instruction, 1.0)
+            self.side_by_side_partner[i] = -1 if car.side_by_side_with is None else self.index_of[id(car.side_by_side_with)]
+            self.side_by_side_ticks[i] = car.side_by_side_ticks
+
+            for column, znum in enumerate(self.zone_numbers):
+                stamp = car.drs_eligible_lap.get(znum)
+                self.drs_stamp[i, column] = NO_STAMP if stamp is None else stamp
+
+        if refresh_pace:
+            self.refresh_pace(indices)
+
+    def push_to_cars(self, indices=None) -> None:
+        # Write the array state back to the CarAgent objects.
+        for i in (range(len(self.cars)) if indices is None else indices):
+            car = self.cars[i]
+            car.track_position = float(self.position[i])
+            car.prev_track_position = float(self.prev_position[i])
+            car.lap_count = int(self.lap_count[i])
+            car.current_lap_time = float(self.current_lap_time[i])
+            car.last_speed_mps = float(self.speed[i])
+            car.lap_execution_noise = float(self.lap_noise[i])
+            car.last_lap_for_noise = int(self.last_lap_for_noise[i])
+            car.overtake_cooldown = float(self.overtake_cooldown[i])
+            car.drs_active = bool(self.drs_active[i])
+            car.has_taken_race_start = bool(self.has_started[i])
+            car.side_by_side_ticks = int(self.side_by_side_ticks[i])
+            partner = int(self.side_by_side_partner[i])
+            car.side_by_side_with = None if partner < 0 else self.cars[partner]
+
+            if not self.in_pit_lane[i]:
+                car.traffic_penalty = float(self.traffic_penalty[i])
+                car.slipstream_bonus = float(self.slipstream_bonus[i])
+                car.following_intensity = float(self.following_intensity[i])
+                car.gap_ahead = float(self.gap_ahead[i])
+                car.gap_behind = float(self.gap_behind[i])
+                car.car_ahead = None if self.ahead_index[i] < 0 else self.cars[int(self.ahead_index[i])]
+                car.car_behind = None if self.behind_index[i] < 0 else self.cars[int(self.behind_index[i])]
+
+            car.drs_eligible_lap = {
+                znum: int(self.drs_stamp[i, column])
+                for column, znum in enumerate(self.zone_numbers)
+                if self.drs_stamp[i, column] != NO_STAMP
+            }
+
+    def sync_to_cars(self) -> None:
+        self.push_to_cars()
+
+    def refresh_race_state(self, k: int) -> None:
+        # Race-level flags only change inside the once-per-lap events.
+        rm = self.rms[k]
+        self.drs_enabled_race[k] = rm.is_drs_enabled()
+        self.green_race[k] = rm.track_state == "GREEN"
+        self.race_done[k] = rm.race_finished
+
+    def refresh_pace(self, indices) -> None:
+        # The once-per-lap part of compute_speed (tyre, fuel, evolution and track state),
+        # with one vectorised tyre model call per race.
+        indices = np.asarray(indices, dtype=np.int64)
+        races = self.race_of[indices]
+
+        for k in np.unique(races):
+            rm = self.rms[k]
+            idx = indices[races == k]
+            tyres = [self.cars[i].tyre_state for i in idx]
+
+            tyre_delta = rm.tyre_model.lap_delta_array(
+                [tyre.age_laps for tyre in tyres],
+                [tyre.compound for tyre in tyres],
+                [tyre.weekend_role for tyre in tyres],
+                rm.track_deg_multiplier,
+                self.k_team[idx],
+            )
+
+            race_fraction = np.minimum(1.0, np.maximum(0.0, self.lap_count[idx] / max(1, rm.total_laps)))
+            fuel_penalty = 1.70 * (1.0 - race_fraction)
+
+            effective_lap_time = rm.base_lap_time + self.mu_team[idx] + tyre_delta + fuel_penalty
+            effective_lap_time *= (1.0 - (0.0055 * float(rm.evolution_level)))
+
+            if rm.track_state == "VSC":
+                effective_lap_time *= 1.28
+
+            elif rm.track_state == "SC":
+                effective_lap_time *= 1.55
+
+            self.effective_lap_time[idx] = effective_lap_time
+
+    # ===== TRAFFIC =====
+    def update_relations(self) -> None:
+        # Vector version of apply_spatial_dirty_air over every running car of every race.
+        L = self.track_length
+        active = ~self.retired & ~self.in_pit_lane
+        progress = np.where(active, self.lap_count * L + self.position, -np.inf)
+
+        # Group by race, then leader first. lexsort is stable, so ties keep field order.
+        order = np.lexsort((-progress, self.race_of))
+        ordered_progress = progress[order]
+
+        self.ahead_index[active] = -1
+        self.behind_index[active] = -1
+        self.gap_ahead[active] = np.inf
+        self.gap_behind[active] = np.inf
+
+        # Running cars sort ahead of excluded ones inside a race, so a link needs
+        # the follower to be running and in the same race as the car in front.
+        linked = active[order[1:]] & (self.race_of[order[1:]] == self.race_of[order[:-1]])
+        front = order[:-1][linked]
+        back = order[1:][linked]
+        gaps = np.maximum(0.0, ordered_progress[:-1][linked] - ordered_progress[1:][linked])
+
+        self.ahead_index[back] = front
+        self.gap_ahead[back] = gaps
+        self.behind_index[front] = back
+        self.gap_behind[front] = gaps
+
+        gap = self.gap_ahead[active]
+        close = gap < 10.0
+        near = ~close & (gap < 25.0)
+        self.traffic_penalty[active] = np.where(close, 0.16, np.where(near, 0.07, 0.0))
+        self.slipstream_bonus[active] = np.where(close, 0.10, np.where(near, 0.05, 0.0))
+        self.following_intensity[active] = np.where(close, 0.75, np.where(near, 0.35, 0.0))
+
+    # ===== SPEED MODEL =====
+    def compute_speeds(self, idx: np.ndarray, seg_idx: np.ndarray) -> np.ndarray:
+        # Batched compute_speed for the cars in idx.
+        seg_len = self.seg_len[seg_idx]
+        seg_frac = self.seg_frac[seg_idx]
+
+        base_speed = self.track_length / np.maximum(self.effective_lap_time[idx], 1e-6)
+        seg_time = seg_len / np.maximum(base_speed, 1e-6)
+        seg_time += (self.lap_noise[idx] + self.traffic_penalty[idx] - self.slipstream_bonus[idx]) * seg_frac
+
+        noise = self.noise.segment_normals(idx)
+        seg_time += noise[0] * (seg_time * self.seg_sigma_coeff[seg_idx] * self.std_scale[idx])
+        seg_time *= self.instruction_mult[idx]
+
+        drs = self.drs_active[idx] & (self.seg_type[seg_idx] == SEG_STRAIGHT) & self.green_race[self.race_of[idx]]
+        seg_time = np.where(drs, seg_time * 0.9815, seg_time)
+
+        seg_time += noise[1] * 0.0012
+
+        speed = seg_len / np.maximum(seg_time, 1e-6)
+        defending = (self.behind_index[idx] >= 0) & (self.gap_behind[idx] < 1.5 * self.car_length[idx])
+        speed = np.where(defending, speed - 0.5, speed)
+        return np.maximum(0.0, speed)
+
+    # ===== MAIN TICK =====
+    def step_tick(self, dt: float) -> None:
+        # Advance every unfinished race by one tick.
+        L = self.track_length
+        live_races = np.flatnonzero(~self.race_done)
+        if not len(live_races):
+            return
+
+        self.update_relations()
+
+        for k in live_races:
+            self.rms[k].sim_time += dt
+        self.race_ticks[live_races] += 1
+
+        alive = ~self.race_done[self.race_of] & ~self.retired
+        self.overtake_cooldown[alive] = np.maximum(0.0, self.overtake_cooldown[alive] - dt)
+
+        running = alive & (self.lap_count < self.total_laps)
+        on_track = np.flatnonzero(running & ~self.in_pit_lane)
+        in_pit = np.flatnonzero(running & self.in_pit_lane)
+        races_to_update = set()
+
+        if len(on_track):
+            pos = self.position[on_track]
+            seg_idx = self.segment_index(pos)
+            straight = self.seg_type[seg_idx] == SEG_STRAIGHT
+            drs_enabled = self.drs_enabled_race[self.race_of[on_track]]
+
+            # ===== DRS ACTIVATION =====
+            if len(self.zone_numbers) and np.any(drs_enabled):
+                laps = self.lap_count[on_track][:, None]
+                stamps = self.drs_stamp[on_track]
+                valid = (stamps == laps) | (stamps == laps - 1)
+                in_window = np.where(
+                    self.zone_end >= self.zone_start,
+                    (pos[:, None] >= self.zone_start) & (pos[:, None] <= self.zone_end),
+                    (pos[:, None] >= self.zone_start) | (pos[:, None] <= self.zone_end),
+                )
+                self.drs_active[on_track] = drs_enabled & straight & np.any(valid & in_window, axis=1)
+            else:
+                self.drs_active[on_track] = False
+
+            # ===== OVERTAKES =====
+            self.trigger_overtakes(on_track, seg_idx)
+
+            # ===== LAP NOISE =====
+            new_lap = self.lap_count[on_track] != self.last_lap_for_noise[on_track]
+            if np.any(new_lap):
+                fresh = on_track[new_lap]
+                self.lap_noise[fresh] = self.noise.lap_normals(fresh) * (0.16 * self.std_scale[fresh])
+                self.last_lap_for_noise[fresh] = self.lap_count[fresh]
+
+            # ===== MOVE =====
+            speed = self.compute_speeds(on_track, seg_idx)
+            self.speed[on_track] = speed
+            distance = speed * dt
+            new_pos = pos + distance
+            crossed = new_pos >= L
+
+            curr = np.mod(new_pos, L)
+            self.prev_position[on_track] = pos
+            self.position[on_track] = curr
+            self.lap_count[on_track] += crossed
+
+            # ===== DRS DETECTION =====
+            if len(self.zone_numbers) and np.any(drs_enabled):
+                self.update_drs_eligibility(on_track[drs_enabled], pos[drs_enabled], curr[drs_enabled])
+
+            # ===== PIT ENTRY =====
+            pending = self.pending_pit[on_track] & self.pit_enabled[on_track]
+            if np.any(pending):
+                entry = self.pit_entry_point[on_track]
+                at_entry = np.where(pos <= curr, (pos < entry) & (entry <= curr), (entry > pos) | (entry <= curr))
+
+                for i in on_track[pending & at_entry]:
+                    self.push_to_cars([i])
+                    self.rms[self.race_of[i]].maybe_enter_pit_lane(self.cars[i])
+                    self.pull_from_cars([i])
+
+            # ===== LINE CROSSINGS =====
+            ratio = np.ones(len(on_track))
+            if np.any(crossed):
+                distance_to_line = np.maximum(0.0, L - pos[crossed])
+                ratio[crossed] = np.clip(distance_to_line / np.maximum(distance[crossed], 1e-9), 0.0, 1.0)
+                races_to_update.update(self.race_of[on_track[crossed]].tolist())
+
+            finishing = crossed & ~self.in_pit_lane[on_track]
+            self.current_lap_time[on_track[~finishing]] += dt
+
+            for k in np.flatnonzero(finishing):
+                self.finish_lap(int(on_track[k]), dt, float(ratio[k]))
+
+        # ===== PIT LANE =====
+        for i in in_pit:
+            car = self.cars[i]
+            self.push_to_cars([i])
+            lap_before = car.lap_count
+            self.rms[self.race_of[i]].handle_pit_lane_tick(car, dt)
+
+            # Pace only changes when the car crosses the line or leaves on new tyres.
+            changed = car.lap_count != lap_before or not car.in_pit_lane
+            self.pull_from_cars([i], refresh_pace=changed)
+
+            if changed:
+                races_to_update.add(int(self.race_of[i]))
+
+        races_to_update.update(self.resolve_side_by_side_battles())
+
+        for k in sorted(races_to_update):
+            self.update_race_events(k)
+
+    def update_race_events(self, k: int) -> None:
+        # Lap-level events run on the CarAgent objects of one race.
+        indices = self.race_indices(k)
+        self.push_to_cars(indices)
+        self.rms[k].update_global_lap_and_events()
+        self.pull_from_cars(indices)
+        self.refresh_race_state(k)
+
+    def update_drs_eligibility(self, idx: np.ndarray, prev_pos: np.ndarray, curr_pos: np.ndarray) -> None:
+        has_ahead = self.ahead_index[idx] >= 0
+        prev = prev_pos[:, None]
+        curr = curr_pos[:, None]
+        marker = self.zone_detect[None, :]
+
+        crossed = np.where(prev <= curr, (prev < marker) & (marker <= curr), (marker > prev) | (marker <= curr))
+        crossed &= has_ahead[:, None]
+
+        if not np.any(crossed):
+            return
+
+        gap_s = self.gap_ahead[idx] / np.maximum(self.speed[idx], 1e-6)
+        within = (gap_s <= 1.0)[:, None]
+        laps = np.broadcast_to(self.lap_count[idx][:, None], crossed.shape)
+
+        stamps = self.drs_stamp[idx]
+        stamps = np.where(crossed & within, laps, stamps)
+        stamps = np.where(crossed & ~within, NO_STAMP, stamps)
+        self.drs_stamp[idx] = stamps
+
+    def finish_lap(self, i: int, dt: float, crossing_ratio: float) -> None:
+        # Lap completion goes through the scalar RaceManager path so lap records stay identical.
+        crossing_dt = dt * crossing_ratio
+        overflow_dt = max(0.0, dt - crossing_dt)
+
+        if not self.has_started[i]:
+            self.has_started[i] = True
+            self.current_lap_time[i] = overflow_dt
+            return
+
+        car = self.cars[i]
+        self.push_to_cars([i])
+        self.rms[self.race_of[i]].finalise_lap_if_crossed(
+            car,
+            crossed_line=True,
+            apply_tyre_wear=True,
+            completed_lap_time=car.current_lap_time + crossing_dt,
+            next_lap_carry_time=overflow_dt,
+        )
+        self.pull_from_cars([i])
+
+    # ===== RACECRAFT =====
+    def trigger_overtakes(self, idx: np.ndarray, seg_idx: np.ndarray) -> None:
+        # Cheap vector filter first, then the few real candidates roll in field order.
+        seg_type = self.seg_type[seg_idx]
+        drs_straight = self.drs_active[idx] & (seg_type == SEG_STRAIGHT)
+        max_gap = np.where(drs_straight, 1.35, 1.00) * self.car_length[idx]
+
+        candidate = (
+            self.green_race[self.race_of[idx]]
+            & (self.ahead_index[idx] >= 0)
+            & (self.overtake_cooldown[idx] <= 0)
+            & ((seg_type == SEG_STRAIGHT) | (seg_type == SEG_BRAKING))
+            & (self.gap_ahead[idx] <= max_gap)
+        )
+
+        for k in np.flatnonzero(candidate):
+            i = int(idx[k])
+            j = int(self.ahead_index[i])
+
+            if self.side_by_side_partner[i] >= 0 or self.side_by_side_partner[j] >= 0:
+                continue
+
+            attacker = self.cars[i]
+            defender = self.cars[j]
+
+            pace_delta = defender.calibration.mu_team - attacker.calibration.mu_team
+            tyre_advantage = (defender.tyre_state.age_laps - attacker.tyre_state.age_laps) * 0.015
+
+            probability = 0.05
+            probability += max(0.0, pace_delta * 0.28)
+            probability += max(0.0, tyre_advantage)
+
+            if drs_straight[k]:
+                probability += 0.08
+
+            probability /= max(0.75, min(float(self.overtake_difficulty[i]), 1.5))
+            probability = min(max(probability, 0.015), 0.35)
+
+            if self.noise.overtake_uniform(i) < probability:
+                self.overtake_cooldown[i] = 2.0
+                self.side_by_side_partner[i] = j
+                self.side_by_side_partner[j] = i
+                self.side_by_side_ticks[i] = 5
+                self.side_by_side_ticks[j] = 5
+
+    def resolve_side_by_side_battles(self) -> set:
+        # Returns the races where a battle moved cars, since that can change lap counts.
+        partners = np.flatnonzero((self.side_by_side_partner >= 0) & ~self.race_done[self.race_of])
+        if not len(partners):
+            return set()
+
+        L = self.track_length
+        processed = set()
+        resolved_races = set()
+
+        for i in partners:
+            i = int(i)
+            j = int(self.side_by_side_partner[i])
+            if j < 0:
+                continue
+
+            pair = (min(i, j), max(i, j))
+            if pair in processed:
+                continue
+            processed.add(pair)
+
+            self.side_by_side_ticks[i] -= 1
+            self.side_by_side_ticks[j] -= 1
+
+            if self.side_by_side_ticks[i] > 0:
+                continue
+
+            pair_idx = np.array([i, j])
+            seg = self.segment_index(np.full(2, self.position[i]))
+            speeds = self.compute_speeds(pair_idx, seg) + 0.20 * self.noise.battle_normals(pair_idx)
+
+            winner, loser = (i, j) if speeds[0] > speeds[1] else (j, i)
+
+            winner_progress = self.lap_count[winner] * L + self.position[winner]
+            loser_progress = self.lap_count[loser] * L + self.position[loser]
+            front_progress = max(winner_progress, loser_progress)
+            back_progress = min(winner_progress, loser_progress)
+
+            target_gap = self.car_length[winner] * 1.15
+            winner_new = front_progress + (0.20 * self.car_length[winner])
+            loser_new = winner_new - target_gap
+
+            if int(winner_new // L) != int(front_progress // L):
+                winner_new = front_progress
+
+            if int(loser_new // L) != int(back_progress // L):
+                loser_new = max(back_progress - 0.10 * self.car_length[loser], 0.0)
+
+            for car_index, progress in ((winner, winner_new), (loser, loser_new)):
+                progress = max(0.0, progress)
+                self.lap_count[car_index] = int(progress // L)
+                self.position[car_index] = progress % L
+                self.prev_position[car_index] = self.position[car_index]
+
+            self.overtake_cooldown[winner] = 2.0
+            self.overtake_cooldown[loser] = 3.0
+            self.side_by_side_partner[winner] = -1
+            self.side_by_side_partner[loser] = -1
+            self.side_by_side_ticks[winner] = 0
+            self.side_by_side_ticks[loser] = 0
+            resolved_races.add(int(self.race_of[i]))
+
+        return resolved_races
+
+    # ===== BATCH RUN =====
+    def run(self, max_ticks: int | None = None) -> int:
+        # Tick every race until all of them finish and return the number of batch ticks.
+        dt = self.rms[0].dt
+        ticks = 0
+
+        while not np.all(self.race_done):
+            if max_ticks is not None and ticks >= max_ticks:
+                break
+
+            self.step_tick(dt)
+            ticks += 1
+
+        self.sync_to_cars()
+        return ticks
+
+
+class VectorizedRaceEngine(BatchedRaceEngine):
+    def __init__(self, race_manager: RaceManager, seed: int | None = None):
+        # One race is a batch of one.
+        super().__init__([race_manager], seeds=[race_manager.seed if seed is None else seed])
+        self.rm = race_manager